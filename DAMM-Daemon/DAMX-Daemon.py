@@ -3,22 +3,39 @@
 # Compatible with Predator and Nitro laptops
 
 import os
+import errno
+import functools
+import re
 import subprocess
 import sys
 import json
 import time
-import argparse
 import logging
 import logging.handlers
 import socket
-import threading
+import selectors
+import struct
 import signal
-import configparser
-import traceback
-from pathlib import Path
+import queue
+import threading
 from enum import Enum
 from PowerSourceDetection import PowerSourceDetector 
-from typing import Dict, List, Tuple, Set
+from typing import Callable, Dict, FrozenSet, List, Tuple, Set, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
 # from KeyboardMonitor import KeyboardMonitor
 
 # Constants
@@ -28,6 +45,53 @@ LOG_PATH = "/var/log/DAMX_Daemon_Log.log"
 CONFIG_PATH = "/etc/DAMX_Daemon/config.ini"
 PID_FILE = "/var/run/DAMX-Daemon.pid"
 MODPROBE_CONFIG_PATH = "/etc/modprobe.d/acer-sense.conf"
+LINUWU_MODULE_PATH = "/sys/module/linuwu_sense"
+PREDATOR_SENSE_PATH = "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/predator_sense"
+NITRO_SENSE_PATH = "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/nitro_sense"
+FOUR_ZONE_KB_PATH = "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/four_zoned_kb"
+
+# Driver and service control commands, the daemon already runs as root so no sudo
+RMMOD_CMD = ('rmmod', 'acer-sense')
+MODPROBE_CMD = ('modprobe', 'acer-sense')
+RESTART_SERVICE_CMD = ('systemctl', 'restart', 'damx-daemon.service')
+
+# Binary framing: one magic byte selecting the payload codec, then a little-endian payload length
+FRAME_HEADER = struct.Struct("<BI")
+FRAME_MAGIC_JSON = 0xDA
+FRAME_MAGIC_MSGPACK = 0xDB
+MAX_FRAME_SIZE = 1024 * 1024
+
+# Written to the wake-up fd, a counter increment of 1 for an eventfd
+_WAKE_BYTES = (1).to_bytes(8, sys.byteorder)
+
+# Shared JSON codec for the socket protocol, both sides work on UTF-8 bytes.
+# orjson or msgspec is used when installed, otherwise one compact stdlib encoder/decoder.
+_json_decoder = json.JSONDecoder()
+
+if orjson is not None:
+    _encode = orjson.dumps
+    _decode = orjson.loads
+elif msgspec is not None:
+    _encode = msgspec.json.Encoder().encode
+    _msgspec_decoder = msgspec.json.Decoder()
+
+    def _decode(data):
+        try:
+            return _msgspec_decoder.decode(data)
+        except msgspec.DecodeError as e:
+            # Callers report malformed requests by catching JSONDecodeError
+            raise json.JSONDecodeError(str(e), "", 0) from None
+else:
+    _json_encoder = json.JSONEncoder(separators=(',', ':'))
+
+    def _encode(obj) -> bytes:
+        return _json_encoder.encode(obj).encode('utf-8')
+
+    def _decode(data):
+        return _json_decoder.decode(data.decode('utf-8'))
+
+# Errors meaning a cached VFS descriptor is unusable (driver reloaded, wrong access mode)
+_STALE_FD_ERRNOS = frozenset((errno.EBADF, errno.ENODEV, errno.ESTALE))
 
 # Check if running as root
 if os.geteuid() != 0:
@@ -61,12 +125,71 @@ class DAMXManager:
     MAX_RESTART_ATTEMPTS = 20
     RESTART_COUNTER_FILE = "/tmp/damx_restart_attempts"
 
+    # How long a VFS read stays valid, keyed by attribute file name (None = never expires)
+    READ_CACHE_TTL_MS = 200
+    READ_CACHE_TTL_OVERRIDES_MS = {
+        "fan_speed": 500,
+        "battery_calibration": 5000,
+        "battery_limiter": 5000,
+    }
+
+    # Attributes whose show() echoes exactly what was last stored, so a
+    # successful write can seed the read cache instead of being read back
+    WRITE_THROUGH_ATTRS = frozenset((
+        "platform_profile",
+        "backlight_timeout",
+        "battery_calibration",
+        "battery_limiter",
+        "boot_animation_sound",
+        "lcd_override",
+        "usb_charging",
+    ))
+
+    # On/off attributes and their display names, each gets a generated
+    # get_<name>() and set_<name>(enabled), and a set_<name> command
+    FLAG_FEATURES = {
+        "backlight_timeout": "backlight timeout",
+        "battery_calibration": "battery calibration",
+        "battery_limiter": "battery limiter",
+        "boot_animation_sound": "boot animation sound",
+        "lcd_override": "LCD override",
+    }
+
+    # Attributes updated at high rates (fan curves, RGB effects), written from
+    # a background thread when AsyncWrites is enabled in the config. Their
+    # set commands then succeed once queued: a value the driver rejects is
+    # only logged, never reported to the client.
+    ASYNC_WRITE_FEATURES = ("fan_speed", "per_zone_mode", "four_zone_mode")
+
+    # Six hex digits, e.g. "4287f5"
+    _HEX6 = staticmethod(re.compile(r"[0-9a-fA-F]{6}").fullmatch)
+
+    # Attribute values are a few dozen bytes; small reads stay in pymalloc's arenas
+    VFS_READ_SIZE = 256
+
+    # How long a full volatile settings snapshot is reused by polling clients
+    SETTINGS_CACHE_TTL_MS = 250
+
     def __init__(self):
         '''The initial init (i know very nice description)'''
-        log.info(f"** Starting DAMX-Daemon v{VERSION} **")
+        log.info("** Starting DAMX-Daemon v%s **", VERSION)
+
+        # path -> (expiry in monotonic ns or None, value)
+        self._cache: Dict[str, Tuple[int, str]] = {}
+        # path -> open descriptor, see _get_fd
+        self._fd_cache: Dict[str, int] = {}
+        # Restart counter file descriptor, see _restart_counter_fd
+        self._restart_fd = None
+        # Background writer, see enable_async_writes
+        self._write_queue = None
+        self._writer_thread = None
+        self._async_write_paths = frozenset()
+        # Last volatile settings snapshot and its expiry in monotonic ns
+        self._settings_cache = None
+        self._settings_cache_expiry = 0
 
         # Check if linuwu_sense is installed
-        if not os.path.exists("/sys/module/linuwu_sense"):
+        if not os.path.exists(LINUWU_MODULE_PATH):
             log.error("linuwu_sense module not found. Please install the linuwu_sense driver first.")
         else:
             log.info("linuwu_sense module found. Proceeding with initialization.")
@@ -83,16 +206,16 @@ class DAMXManager:
             
             if current_attempts < self.MAX_RESTART_ATTEMPTS:
                 attempts = self._increment_restart_attempts()
-                log.warning(f"Unknown laptop type detected, attempting driver restart (attempt {attempts}/{self.MAX_RESTART_ATTEMPTS})...")
+                log.warning("Unknown laptop type detected, attempting driver restart (attempt %s/%s)...", attempts, self.MAX_RESTART_ATTEMPTS)
                 
                 if self._restart_drivers_and_daemon():
                     # The daemon will restart itself, so we should exit this instance
                     log.info("Driver restart initiated, daemon will restart automatically")
                     sys.exit(0)
                 else:
-                    log.error(f"Failed to restart drivers (attempt {attempts}), continuing with limited functionality")
+                    log.error("Failed to restart drivers (attempt %s), continuing with limited functionality", attempts)
             else:
-                log.error(f"Maximum restart attempts ({self.MAX_RESTART_ATTEMPTS}) reached, giving up on driver restart")
+                log.error("Maximum restart attempts (%s) reached, giving up on driver restart", self.MAX_RESTART_ATTEMPTS)
                 log.info("Continuing with unknown laptop type and limited functionality")
         else:
             # Reset counter on successful detection
@@ -105,45 +228,66 @@ class DAMXManager:
         # Available features set
         self.available_features = self._detect_available_features()
 
-        log.info(f"Detected laptop type: {self.laptop_type.name}")
-        log.info(f"Base path: {self.base_path}")
-        log.info(f"Four-zone keyboard: {'Yes' if self.has_four_zone_kb else 'No'}")
-        log.info(f"Available features: {', '.join(self.available_features)}")
+        log.info("Detected laptop type: %s", self.laptop_type.name)
+        log.info("Base path: %s", self.base_path)
+        log.info("Four-zone keyboard: %s", 'Yes' if self.has_four_zone_kb else 'No')
+        log.info("Available features: %s", ', '.join(self.available_features))
 
         # Check if paths exist
         if not os.path.exists(self.base_path) and self.laptop_type != LaptopType.UNKNOWN:
-            log.error(f"Base path does not exist: {self.base_path}")
+            log.error("Base path does not exist: %s", self.base_path)
             raise FileNotFoundError(f"Base path does not exist: {self.base_path}")
-        
+
+        # Attribute paths and profile choices never change while the driver is loaded
+        self._paths = self._attribute_paths()
+        self.thermal_choices = []
+        if "thermal_profile" in self.available_features:
+            # Read once without going through the descriptor and read caches
+            try:
+                with open("/sys/firmware/acpi/platform_profile_choices", 'r') as f:
+                    self.thermal_choices = f.read().split()
+            except OSError as e:
+                log.error("Failed to read thermal profile choices: %s", e)
+
+        # Keep the attributes open so reads and writes skip the path lookup
+        self._preopen_files([path for name, path in self._paths.items() if name in self.available_features])
+        self._static_settings = None
+
         self.power_monitor = None
 
+    def _restart_counter_fd(self) -> int:
+        """Descriptor of the restart counter file, opened once and kept for pread/pwrite"""
+        if self._restart_fd is None:
+            # O_NOFOLLOW since the file lives in world-writable /tmp
+            self._restart_fd = os.open(self.RESTART_COUNTER_FILE,
+                                       os.O_RDWR | os.O_CREAT | os.O_CLOEXEC | os.O_NOFOLLOW, 0o600)
+        return self._restart_fd
+
     def _get_restart_attempts(self) -> int:
         """Get current restart attempt count"""
         try:
-            if os.path.exists(self.RESTART_COUNTER_FILE):
-                with open(self.RESTART_COUNTER_FILE, 'r') as f:
-                    return int(f.read().strip())
-        except (ValueError, IOError):
-            pass
-        return 0
+            return int(os.pread(self._restart_counter_fd(), 16, 0).strip() or b"0")
+        except (ValueError, OSError):
+            return 0
 
     def _increment_restart_attempts(self) -> int:
         """Increment and return restart attempt count"""
         attempts = self._get_restart_attempts() + 1
         try:
-            with open(self.RESTART_COUNTER_FILE, 'w') as f:
-                f.write(str(attempts))
-        except IOError as e:
-            log.error(f"Failed to write restart counter: {e}")
+            fd = self._restart_counter_fd()
+            data = b"%d" % attempts
+            os.pwrite(fd, data, 0)
+            os.ftruncate(fd, len(data))
+        except OSError as e:
+            log.error("Failed to write restart counter: %s", e)
         return attempts
 
     def _reset_restart_attempts(self):
         """Reset restart attempt counter"""
         try:
-            if os.path.exists(self.RESTART_COUNTER_FILE):
-                os.unlink(self.RESTART_COUNTER_FILE)
-        except IOError as e:
-            log.error(f"Failed to reset restart counter: {e}")
+            os.ftruncate(self._restart_counter_fd(), 0)
+        except OSError as e:
+            log.error("Failed to reset restart counter: %s", e)
 
     def _force_model_nitro(self):
         """Restart acer-sense driver and DAMX daemon service with nitro_v4 parameter"""
@@ -151,27 +295,27 @@ class DAMXManager:
 
         try:
             # Remove the module
-            subprocess.run(['sudo', 'rmmod', 'acer-sense'], check=True)
+            subprocess.run(RMMOD_CMD, check=True)
             log.info("Successfully removed acer-sense module")
             
-            # Wait a moment
-            time.sleep(2)
+            # Wait for the old instance to be gone
+            self._wait_module_unloaded()
             
             # Reload the module
-            subprocess.run(['sudo', 'modprobe', 'acer-sense', 'nitro_v4'], check=True)
+            subprocess.run(MODPROBE_CMD + ('nitro_v4',), check=True)
             log.info("Successfully reloaded acer-sense module")
             
-            # Wait a moment for module to initialize
-            time.sleep(3)
+            # Wait for the module to initialize
+            self._wait_module_ready()
             
             # Restart the daemon service
             log.info("Restarting DAMX daemon service (may produce an error)")
-            subprocess.run(['sudo', 'systemctl', 'restart', 'damx-daemon.service'], check=True)
+            subprocess.run(RESTART_SERVICE_CMD, check=True)
             
             return True
         
         except Exception as e:
-            log.error(f"Unexpected error while Forcing Nitro Model: {e}")
+            log.error("Unexpected error while Forcing Nitro Model: %s", e)
             return False
         
 
@@ -181,27 +325,27 @@ class DAMXManager:
 
         try:
             # Remove the module
-            subprocess.run(['sudo', 'rmmod', 'acer-sense'], check=True)
+            subprocess.run(RMMOD_CMD, check=True)
             log.info("Successfully removed acer-sense module")
             
-            # Wait a moment
-            time.sleep(2)
+            # Wait for the old instance to be gone
+            self._wait_module_unloaded()
             
             # Reload the module
-            subprocess.run(['sudo', 'modprobe', 'acer-sense', 'predator_v4'], check=True)
+            subprocess.run(MODPROBE_CMD + ('predator_v4',), check=True)
             log.info("Successfully reloaded acer-sense module")
             
-            # Wait a moment for module to initialize
-            time.sleep(3)
+            # Wait for the module to initialize
+            self._wait_module_ready()
             
             # Restart the daemon service
             log.info("Restarting DAMX daemon service (may produce an error)")
-            subprocess.run(['sudo', 'systemctl', 'restart', 'damx-daemon.service'], check=True)
+            subprocess.run(RESTART_SERVICE_CMD, check=True)
             
             return True
         
         except Exception as e:
-            log.error(f"Unexpected error while Forcing Nitro Model: {e}")
+            log.error("Unexpected error while Forcing Nitro Model: %s", e)
             return False
     
     def _force_enable_all(self):
@@ -210,27 +354,27 @@ class DAMXManager:
 
         try:
             # Remove the module
-            subprocess.run(['sudo', 'rmmod', 'acer-sense'], check=True)
+            subprocess.run(RMMOD_CMD, check=True)
             log.info("Successfully removed acer-sense module")
             
-            # Wait a moment
-            time.sleep(2)
+            # Wait for the old instance to be gone
+            self._wait_module_unloaded()
             
             # Reload the module
-            subprocess.run(['sudo', 'modprobe', 'acer-sense', 'enable_all'], check=True)
+            subprocess.run(MODPROBE_CMD + ('enable_all',), check=True)
             log.info("Successfully reloaded acer-sense module with enable_all parameter")
             
-            # Wait a moment for module to initialize
-            time.sleep(3)
+            # Wait for the module to initialize
+            self._wait_module_ready()
             
             # Restart the daemon service
             log.info("Restarting DAMX daemon service (may produce an error)")
-            subprocess.run(['sudo', 'systemctl', 'restart', 'damx-daemon.service'], check=True)
+            subprocess.run(RESTART_SERVICE_CMD, check=True)
             
             return True
         
         except Exception as e:
-            log.error(f"Unexpected error while Forcing All Features: {e}")
+            log.error("Unexpected error while Forcing All Features: %s", e)
             return False
         
     def _detect_current_modprobe_param(self) -> str:
@@ -246,7 +390,7 @@ class DAMXManager:
                     elif "enable_all" in content:
                         return "enable_all"
         except Exception as e:
-            log.error(f"Failed to read modprobe config: {e}")
+            log.error("Failed to read modprobe config: %s", e)
         return ""
 
     def _set_modprobe_parameter(self, param: str) -> bool:
@@ -259,11 +403,12 @@ class DAMXManager:
             with open(MODPROBE_CONFIG_PATH, 'w') as f:
                 f.write(f"options linuwu_sense {param}=1\n")
             
-            log.info(f"Set modprobe parameter: {param}")
+            log.info("Set modprobe parameter: %s", param)
             self.current_modprobe_param = param
+            self.invalidate_settings_cache()
             return True
         except Exception as e:
-            log.error(f"Failed to set modprobe parameter: {e}")
+            log.error("Failed to set modprobe parameter: %s", e)
             return False
 
     def _remove_modprobe_parameter(self) -> bool:
@@ -273,9 +418,10 @@ class DAMXManager:
                 os.unlink(MODPROBE_CONFIG_PATH)
                 log.info("Removed modprobe parameter config")
             self.current_modprobe_param = ""
+            self.invalidate_settings_cache()
             return True
         except Exception as e:
-            log.error(f"Failed to remove modprobe parameter: {e}")
+            log.error("Failed to remove modprobe parameter: %s", e)
             return False
 
     def get_modprobe_parameter(self) -> str:
@@ -285,7 +431,7 @@ class DAMXManager:
     def set_modprobe_parameter(self, param: str) -> bool:
         """Set modprobe parameter and restart drivers"""
         if param not in ["nitro_v4", "predator_v4", "enable_all", ""]:
-            log.error(f"Invalid modprobe parameter: {param}")
+            log.error("Invalid modprobe parameter: %s", param)
             return False
         
         if param == "":
@@ -303,58 +449,90 @@ class DAMXManager:
     def _restart_daemon(self):
         """Restart DAMX daemon service alone"""
         attempts = self._get_restart_attempts()
-        log.info(f"Attempting to restart daemon")
+        log.info("Attempting to restart daemon")
         
         try:
             # Restart the daemon service
             log.info("Restarting DAMX daemon service (may produce an error)")
-            subprocess.run(['sudo', 'systemctl', 'restart', 'damx-daemon.service'], check=True)
+            subprocess.run(RESTART_SERVICE_CMD, check=True)
             
             return True
             
         except Exception as e:
-            log.error(f"Unexpected error during restart (attempt {attempts}): {e}")
+            log.error("Unexpected error during restart (attempt %s): %s", attempts, e)
             return False
             
 
     def _restart_drivers_and_daemon(self):
         """Restart acer-sense driver and DAMX daemon service"""
         attempts = self._get_restart_attempts()
-        log.info(f"Attempting to restart drivers and daemon (attempt {attempts}/{self.MAX_RESTART_ATTEMPTS})...")
+        log.info("Attempting to restart drivers and daemon (attempt %s/%s)...", attempts, self.MAX_RESTART_ATTEMPTS)
         
         try:
             # Remove the module
-            subprocess.run(['sudo', 'rmmod', 'acer-sense'], check=True)
+            subprocess.run(RMMOD_CMD, check=True)
             log.info("Successfully removed acer-sense module")
             
-            # Wait a moment
-            time.sleep(2)
+            # Wait for the old instance to be gone
+            self._wait_module_unloaded()
             
             # Reload the module
-            subprocess.run(['sudo', 'modprobe', 'acer-sense'], check=True)
+            subprocess.run(MODPROBE_CMD, check=True)
             log.info("Successfully reloaded acer-sense module")
             
-            # Wait a moment for module to initialize
-            time.sleep(3)
+            # Wait for the module to initialize
+            self._wait_module_ready()
             
             # Restart the daemon service
             log.info("Restarting DAMX daemon service (may produce an error)")
-            subprocess.run(['sudo', 'systemctl', 'restart', 'damx-daemon.service'], check=True)
+            subprocess.run(RESTART_SERVICE_CMD, check=True)
             
             return True
             
         except Exception as e:
-            log.error(f"Unexpected error during restart (attempt {attempts}): {e}")
+            log.error("Unexpected error during restart (attempt %s): %s", attempts, e)
             return False
             
+    def _wait_for(self, condition: Callable[[], bool], timeout: float) -> bool:
+        """Poll a condition with exponential backoff (1 ms up to 100 ms) until it holds or timeout seconds pass"""
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while not condition():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+        return True
+
+    def _module_ready(self) -> bool:
+        """Check if linuwu_sense finished initializing and exposed its sense attributes"""
+        try:
+            with open(os.path.join(LINUWU_MODULE_PATH, "initstate"), 'r') as f:
+                if f.read().strip() != "live":
+                    return False
+        except OSError:
+            return False
+        return os.path.exists(PREDATOR_SENSE_PATH) or os.path.exists(NITRO_SENSE_PATH)
+
+    def _wait_module_ready(self, timeout: float = 5.0) -> bool:
+        """Wait until the reloaded driver is live instead of sleeping a fixed time"""
+        if self._wait_for(self._module_ready, timeout):
+            return True
+        log.warning("linuwu_sense not ready after %ss, continuing anyway", timeout)
+        return False
+
+    def _wait_module_unloaded(self, timeout: float = 2.0) -> bool:
+        """Wait until the removed driver has disappeared from sysfs"""
+        if self._wait_for(lambda: not os.path.exists(LINUWU_MODULE_PATH), timeout):
+            return True
+        log.warning("linuwu_sense still present %ss after removal, continuing anyway", timeout)
+        return False
+
     def _detect_laptop_type(self) -> LaptopType:
         """Detect whether this is a Predator or Nitro laptop"""
-        predator_path = "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/predator_sense"
-        nitro_path = "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/nitro_sense"
-
-        if os.path.exists(predator_path):
+        if os.path.exists(PREDATOR_SENSE_PATH):
             return LaptopType.PREDATOR
-        elif os.path.exists(nitro_path):
+        elif os.path.exists(NITRO_SENSE_PATH):
             return LaptopType.NITRO
         else:
             return LaptopType.UNKNOWN
@@ -362,9 +540,9 @@ class DAMXManager:
     def _get_base_path(self) -> str:
         """Get the base path for VFS access based on laptop type"""
         if self.laptop_type == LaptopType.PREDATOR:
-            return "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/predator_sense"
+            return PREDATOR_SENSE_PATH
         elif self.laptop_type == LaptopType.NITRO:
-            return "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/nitro_sense"
+            return NITRO_SENSE_PATH
         else:
             return ""
 
@@ -381,7 +559,7 @@ class DAMXManager:
             return "Unknown Version"
     
 
-    def _detect_available_features(self) -> Set[str]:
+    def _detect_available_features(self) -> FrozenSet[str]:
         """Detect which features are available on the current laptop"""
         available = set()
 
@@ -389,8 +567,10 @@ class DAMXManager:
         if os.path.exists("/sys/firmware/acpi/platform_profile"):
             available.add("thermal_profile")
 
-        # Only check other features if laptop type is recognized
-        if self.laptop_type != LaptopType.UNKNOWN and os.path.exists(self.base_path):
+        # Only check other features if laptop type is recognized; one directory
+        # listing replaces a stat() per attribute
+        if self.laptop_type != LaptopType.UNKNOWN:
+            entries = self._list_dir(self.base_path)
             feature_files = [
                 ("backlight_timeout", "backlight_timeout"),
                 ("battery_calibration", "battery_calibration"),
@@ -400,159 +580,305 @@ class DAMXManager:
                 ("lcd_override", "lcd_override"),
                 ("usb_charging", "usb_charging"),
             ]
-
-            for feature_name, file_name in feature_files:
-                file_path = os.path.join(self.base_path, file_name)
-                if os.path.exists(file_path):
-                    available.add(feature_name)
+            available.update(name for name, file_name in feature_files if file_name in entries)
 
         # Check keyboard features
         if self.has_four_zone_kb:
-            kb_base = "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/four_zoned_kb"
-            if os.path.exists(os.path.join(kb_base, "per_zone_mode")):
-                available.add("per_zone_mode")
-            if os.path.exists(os.path.join(kb_base, "four_zone_mode")):
-                available.add("four_zone_mode")
+            entries = self._list_dir(FOUR_ZONE_KB_PATH)
+            available.update(name for name in ("per_zone_mode", "four_zone_mode") if name in entries)
+
+        # Fixed for the life of the daemon; only ever used for membership tests
+        return frozenset(available)
 
-        return available
+    def _list_dir(self, path: str) -> Set[str]:
+        """Names in a directory, or an empty set if it cannot be listed"""
+        try:
+            return set(os.listdir(path))
+        except OSError:
+            return set()
 
     def _check_four_zone_kb(self) -> bool:
         """Check if four-zone keyboard is available"""
         if self.laptop_type != LaptopType.UNKNOWN:
-            kb_path = "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/four_zoned_kb"
-            return os.path.exists(kb_path)
+            return os.path.exists(FOUR_ZONE_KB_PATH)
         return False
 
+    def _attribute_paths(self) -> Dict[str, str]:
+        """Map each feature to the VFS attribute that backs it"""
+        return {
+            "thermal_profile": "/sys/firmware/acpi/platform_profile",
+            "backlight_timeout": os.path.join(self.base_path, "backlight_timeout"),
+            "battery_calibration": os.path.join(self.base_path, "battery_calibration"),
+            "battery_limiter": os.path.join(self.base_path, "battery_limiter"),
+            "boot_animation_sound": os.path.join(self.base_path, "boot_animation_sound"),
+            "fan_speed": os.path.join(self.base_path, "fan_speed"),
+            "lcd_override": os.path.join(self.base_path, "lcd_override"),
+            "usb_charging": os.path.join(self.base_path, "usb_charging"),
+            "per_zone_mode": os.path.join(FOUR_ZONE_KB_PATH, "per_zone_mode"),
+            "four_zone_mode": os.path.join(FOUR_ZONE_KB_PATH, "four_zone_mode"),
+        }
+
+    def _get_fd(self, path: str, flags: int = os.O_RDONLY) -> int:
+        """Return the cached descriptor for a VFS file, opening it on first use
+
+        Files are opened read-write so one descriptor serves both directions;
+        attributes that refuse that are opened with the given access mode.
+        """
+        fd = self._fd_cache.get(path)
+        if fd is None:
+            try:
+                fd = os.open(path, os.O_RDWR | os.O_CLOEXEC)
+            except PermissionError:
+                fd = os.open(path, flags | os.O_CLOEXEC)
+            self._fd_cache[path] = fd
+        return fd
+
+    def _drop_fd(self, path: str):
+        """Forget and close a cached descriptor"""
+        fd = self._fd_cache.pop(path, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _preopen_files(self, paths: List[str]):
+        """Open VFS files up front so the first poll skips the path lookup too"""
+        for path in paths:
+            try:
+                self._get_fd(path)
+            except OSError as e:
+                log.warning("Could not preopen %s, opening on demand: %s", path, e)
+
+    def close_fds(self):
+        """Close every cached VFS descriptor and the restart counter"""
+        self._stop_async_writes()
+        for path in list(self._fd_cache):
+            self._drop_fd(path)
+        if self._restart_fd is not None:
+            try:
+                os.close(self._restart_fd)
+            except OSError:
+                pass
+            self._restart_fd = None
+
+    def _cache_get(self, path: str):
+        """Return the cached value for a VFS file, or None if missing or expired"""
+        entry = self._cache.get(path)
+        if entry is None:
+            return None
+        expiry, value = entry
+        if expiry is not None and time.monotonic_ns() >= expiry:
+            return None
+        return value
+
+    def _cache_put(self, path: str, value: str):
+        """Remember a VFS read for the attribute's TTL"""
+        ttl_ms = self.READ_CACHE_TTL_OVERRIDES_MS.get(os.path.basename(path), self.READ_CACHE_TTL_MS)
+        expiry = None if ttl_ms is None else time.monotonic_ns() + ttl_ms * 1_000_000
+        self._cache[path] = (expiry, value)
+
     def _read_file(self, path: str) -> str:
         """Read from a VFS file"""
-        try:
-            with open(path, 'r') as f:
-                return f.read().strip()
-        except Exception as e:
-            log.error(f"Failed to read from {path}: {e}")
-            return ""
+        value = self._cache_get(path)
+        if value is not None:
+            return value
 
-    def _write_file(self, path: str, value: str) -> bool:
-        """Write to a VFS file"""
         try:
-            with open(path, 'w') as f:
-                f.write(str(value))
-            return True
-        except Exception as e:
-            log.error(f"Failed to write to {path}: {e}")
-            return False
-
-    def get_thermal_profile(self) -> str:
-        """Get current thermal profile"""
-        if "thermal_profile" not in self.available_features:
+            value = self._read_raw(path)
+        except OSError as e:
+            log.error("Failed to read from %s: %s", path, e)
             return ""
-        return self._read_file("/sys/firmware/acpi/platform_profile")
 
-    def set_thermal_profile(self, profile: str) -> bool:
-        """Set thermal profile"""
-        if "thermal_profile" not in self.available_features:
-            return False
+        self._cache_put(path, value)
+        return value
 
-        available_profiles = self.get_thermal_profile_choices()
-        if profile not in available_profiles:
-            log.error(f"Invalid thermal profile: {profile}. Available profiles: {available_profiles}")
-            return False
+    def _read_raw(self, path: str) -> str:
+        """Read a VFS file through its cached descriptor, bypassing the read cache"""
+        data = self._read_bytes(path, self.VFS_READ_SIZE)
+        if len(data) == self.VFS_READ_SIZE:
+            # Unusually long value, read it whole
+            data = self._read_bytes(path, 4096)
+        return data.decode('utf-8', 'replace').strip()
 
-        return self._write_file("/sys/firmware/acpi/platform_profile", profile)
+    def _read_bytes(self, path: str, size: int = 32) -> bytes:
+        """Read the raw contents of a VFS file from offset 0, bypassing the read cache"""
+        try:
+            return os.pread(self._get_fd(path), size, 0)
+        except OSError as e:
+            if e.errno not in _STALE_FD_ERRNOS:
+                raise
+            # Stale descriptor, retry once with a fresh one
+            self._drop_fd(path)
+            return os.pread(self._get_fd(path), size, 0)
+
+    def _batch_read(self, paths: List[str]) -> Dict[str, str]:
+        """Read several VFS files in one pass, skipping Python's buffered IO layers"""
+        results = {}
+        for path in paths:
+            value = self._cache_get(path)
+            if value is None:
+                try:
+                    value = self._read_raw(path)
+                except OSError as e:
+                    log.error("Failed to read from %s: %s", path, e)
+                    results[path] = ""
+                    continue
+                # Only fresh reads restart the TTL, hits must still expire
+                self._cache_put(path, value)
 
-    def get_thermal_profile_choices(self) -> List[str]:
-        """Get available thermal profiles"""
-        if "thermal_profile" not in self.available_features:
-            return []
+            results[path] = value
+        return results
 
-        choices = self._read_file("/sys/firmware/acpi/platform_profile_choices")
-        return choices.split() if choices else []
+    def _write_file(self, path: str, value: str) -> bool:
+        """Write to a VFS file"""
+        return self._write_bytes(path, str(value).encode('utf-8'))
 
-    def get_backlight_timeout(self) -> str:
-        """Get backlight timeout status"""
-        if "backlight_timeout" not in self.available_features:
-            return ""
+    def _write_bytes(self, path: str, data: bytes) -> bool:
+        """Write pre-encoded bytes to a VFS file through its cached descriptor
 
-        return self._read_file(os.path.join(self.base_path, "backlight_timeout"))
+        With async writes enabled, writes to ASYNC_WRITE_FEATURES are queued
+        for the writer thread and reported as successful right away.
+        """
+        # Only this (the main) thread touches the read and descriptor caches
+        self._cache.pop(path, None)
+        self._settings_cache = None
+        if self._write_queue is not None and path in self._async_write_paths:
+            self._write_queue.put((path, data))
+            return True
+        return self._write_now(path, data)
 
-    def set_backlight_timeout(self, enabled: bool) -> bool:
-        """Set backlight timeout status"""
-        if "backlight_timeout" not in self.available_features:
+    def _write_now(self, path: str, data: bytes) -> bool:
+        """Write to a VFS file on the calling thread"""
+        try:
+            try:
+                os.pwrite(self._get_fd(path, os.O_WRONLY), data, 0)
+            except OSError as e:
+                if e.errno not in _STALE_FD_ERRNOS:
+                    raise
+                # Stale descriptor, retry once with a fresh one
+                self._drop_fd(path)
+                os.pwrite(self._get_fd(path, os.O_WRONLY), data, 0)
+        except OSError as e:
+            log.error("Failed to write to %s: %s", path, e)
             return False
 
-        return self._write_file(
-            os.path.join(self.base_path, "backlight_timeout"),
-            "1" if enabled else "0"
-        )
+        if os.path.basename(path) in self.WRITE_THROUGH_ATTRS:
+            self._cache_put(path, data.decode('utf-8', 'replace').strip())
+        return True
 
-    def get_battery_calibration(self) -> str:
-        """Get battery calibration status"""
-        if "battery_calibration" not in self.available_features:
-            return ""
-
-        return self._read_file(os.path.join(self.base_path, "battery_calibration"))
-
-    def set_battery_calibration(self, enabled: bool) -> bool:
-        """Start or stop battery calibration"""
-        if "battery_calibration" not in self.available_features:
-            return False
+    def enable_async_writes(self):
+        """Hand writes of the high-rate attributes to a background writer thread
 
-        return self._write_file(
-            os.path.join(self.base_path, "battery_calibration"),
-            "1" if enabled else "0"
+        Queued writes are applied in order; failures are only logged since the
+        client has already been answered. The writer uses its own descriptors
+        and never touches the caches, which stay owned by the main thread.
+        """
+        if self._write_queue is not None:
+            return
+        self._async_write_paths = frozenset(
+            self._paths[name] for name in self.ASYNC_WRITE_FEATURES if name in self.available_features
         )
-
-    def get_battery_limiter(self) -> str:
-        """Get battery limiter status"""
-        if "battery_limiter" not in self.available_features:
+        self._write_queue = queue.SimpleQueue()
+        self._writer_thread = threading.Thread(target=self._writer_loop, name="DAMX-Writer", daemon=True)
+        self._writer_thread.start()
+        log.info("Async writes enabled for: %s (write errors are only logged)",
+                 ', '.join(self.ASYNC_WRITE_FEATURES))
+
+    def _writer_loop(self):
+        """Apply queued writes until a None sentinel arrives"""
+        # path -> write-only descriptor private to this thread
+        fds: Dict[str, int] = {}
+        try:
+            while True:
+                item = self._write_queue.get()
+                if item is None:
+                    return
+                path, data = item
+                try:
+                    self._writer_pwrite(fds, path, data)
+                except OSError as e:
+                    log.error("Failed to write to %s: %s", path, e)
+        finally:
+            for fd in fds.values():
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _writer_pwrite(fds: Dict[str, int], path: str, data: bytes):
+        """Write through the writer thread's descriptor for path, reopening it once if stale"""
+        for retry in (False, True):
+            fd = fds.get(path)
+            if fd is None:
+                fd = fds[path] = os.open(path, os.O_WRONLY | os.O_CLOEXEC)
+            try:
+                os.pwrite(fd, data, 0)
+                return
+            except OSError as e:
+                if retry or e.errno not in _STALE_FD_ERRNOS:
+                    raise
+                del fds[path]
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+    def _stop_async_writes(self):
+        """Flush and stop the writer thread"""
+        if self._write_queue is None:
+            return
+        self._write_queue.put(None)
+        self._writer_thread.join(timeout=2)
+        self._write_queue = None
+        self._writer_thread = None
+
+    def _read_feature(self, feature: str) -> str:
+        """Read a feature's attribute, or "" if the feature is not available"""
+        if feature not in self.available_features:
             return ""
+        return self._read_file(self._paths[feature])
 
-        return self._read_file(os.path.join(self.base_path, "battery_limiter"))
-
-    def set_battery_limiter(self, enabled: bool) -> bool:
-        """Set battery limiter status"""
-        if "battery_limiter" not in self.available_features:
+    def _write_flag(self, feature: str, enabled: bool) -> bool:
+        """Switch an on/off feature, False if it is not available"""
+        if feature not in self.available_features:
             return False
+        return self._write_bytes(self._paths[feature], b"1" if enabled else b"0")
 
-        return self._write_file(
-            os.path.join(self.base_path, "battery_limiter"),
-            "1" if enabled else "0"
-        )
-
-    def get_boot_animation_sound(self) -> str:
-        """Get boot animation sound status"""
-        if "boot_animation_sound" not in self.available_features:
-            return ""
+    def get_thermal_profile(self) -> str:
+        """Get current thermal profile"""
+        return self._read_feature("thermal_profile")
 
-        return self._read_file(os.path.join(self.base_path, "boot_animation_sound"))
+    def set_thermal_profile(self, profile: str) -> bool:
+        """Set thermal profile"""
+        if "thermal_profile" not in self.available_features:
+            return False
 
-    def set_boot_animation_sound(self, enabled: bool) -> bool:
-        """Set boot animation sound status"""
-        if "boot_animation_sound" not in self.available_features:
+        available_profiles = self.get_thermal_profile_choices()
+        if profile not in available_profiles:
+            log.error("Invalid thermal profile: %s. Available profiles: %s", profile, available_profiles)
             return False
 
-        return self._write_file(
-            os.path.join(self.base_path, "boot_animation_sound"),
-            "1" if enabled else "0"
-        )
+        return self._write_file(self._paths["thermal_profile"], profile)
+
+    def get_thermal_profile_choices(self) -> List[str]:
+        """Get available thermal profiles"""
+        return self.thermal_choices
 
     def get_fan_speed(self) -> Tuple[str, str]:
         """Get CPU and GPU fan speeds"""
         if "fan_speed" not in self.available_features:
             return ("", "")
 
-        file_path = os.path.join(self.base_path, "fan_speed")
-
-        try:
-            with open(file_path, 'r') as f:
-                speeds = f.read().strip()
-
-                if "," in speeds:
-                    cpu, gpu = speeds.split(",", 1)
-                    return (cpu.strip(), gpu.strip())
-        except Exception as e:
-            log.error(f"Error reading fan speed: {e}")
+        return self._split_fan_speed(self._read_file(self._paths["fan_speed"]))
 
+    @staticmethod
+    def _split_fan_speed(value: str) -> Tuple[str, str]:
+        """Split a "cpu,gpu" fan_speed value, ("0", "0") if it is malformed"""
+        cpu, sep, gpu = value.partition(",")
+        if sep:
+            return (cpu, gpu)
         return ("0", "0")  # Fallback
 
     def set_fan_speed(self, cpu: int, gpu: int) -> bool:
@@ -562,38 +888,37 @@ class DAMXManager:
 
         # Validate values
         if not (0 <= cpu <= 100 and 0 <= gpu <= 100):
-            log.error(f"Invalid fan speeds. Values must be between 0 and 100: cpu={cpu}, gpu={gpu}")
+            log.error("Invalid fan speeds. Values must be between 0 and 100: cpu=%s, gpu=%s", cpu, gpu)
             return False
 
-        return self._write_file(
-            os.path.join(self.base_path, "fan_speed"),
-            f"{cpu},{gpu}"
-        )
-
+        return self._write_bytes(self._paths["fan_speed"], b"%d,%d" % (cpu, gpu))
 
-    def get_lcd_override(self) -> str:
-        """Get LCD override status"""
-        if "lcd_override" not in self.available_features:
-            return ""
+    def set_fan_curve(self, points: List[Tuple[int, int]]) -> bool:
+        """Validate a sequence of (cpu, gpu) fan speeds and apply the first one
 
-        return self._read_file(os.path.join(self.base_path, "lcd_override"))
+        Nothing is written unless every point is valid. The firmware only keeps
+        the last value written, so the caller holds each point for a while and
+        applies the following ones with set_fan_speed.
+        """
+        if "fan_speed" not in self.available_features:
+            return False
 
-    def set_lcd_override(self, enabled: bool) -> bool:
-        """Set LCD override status"""
-        if "lcd_override" not in self.available_features:
+        if not points:
+            log.error("Fan curve must contain at least one point")
             return False
 
-        return self._write_file(
-            os.path.join(self.base_path, "lcd_override"),
-            "1" if enabled else "0"
-        )
+        for cpu, gpu in points:
+            if not (0 <= cpu <= 100 and 0 <= gpu <= 100):
+                log.error("Invalid fan curve point. Values must be between 0 and 100: cpu=%s, gpu=%s", cpu, gpu)
+                return False
+
+        cpu, gpu = points[0]
+        return self._write_bytes(self._paths["fan_speed"], b"%d,%d" % (cpu, gpu))
+
 
     def get_usb_charging(self) -> str:
         """Get USB charging status"""
-        if "usb_charging" not in self.available_features:
-            return ""
-
-        return self._read_file(os.path.join(self.base_path, "usb_charging"))
+        return self._read_feature("usb_charging")
 
     def set_usb_charging(self, level: int) -> bool:
         """Set USB charging level (0, 10, 20, 30)"""
@@ -602,20 +927,14 @@ class DAMXManager:
 
         # Validate values
         if level not in [0, 10, 20, 30]:
-            log.error(f"Invalid USB charging level. Must be 0, 10, 20, or 30: {level}")
+            log.error("Invalid USB charging level. Must be 0, 10, 20, or 30: %s", level)
             return False
 
-        return self._write_file(
-            os.path.join(self.base_path, "usb_charging"),
-            str(level)
-        )
+        return self._write_bytes(self._paths["usb_charging"], b"%d" % level)
 
     def get_per_zone_mode(self) -> str:
         """Get per-zone mode configuration"""
-        if "per_zone_mode" not in self.available_features:
-            return ""
-
-        return self._read_file("/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/four_zoned_kb/per_zone_mode")
+        return self._read_feature("per_zone_mode")
 
     def set_per_zone_mode(self, zone1: str, zone2: str, zone3: str, zone4: str, brightness: int) -> bool:
         """Set per-zone mode configuration
@@ -628,34 +947,25 @@ class DAMXManager:
             return False
 
         # Validate hex values
-        for i, zone in enumerate([zone1, zone2, zone3, zone4], 1):
-            try:
-                # Check if valid hex color
-                int(zone, 16)
-                if len(zone) != 6:
-                    log.error(f"Invalid hex color for zone {i}: {zone}. Must be 6 characters.")
-                    return False
-            except ValueError:
-                log.error(f"Invalid hex color for zone {i}: {zone}")
+        for i, zone in enumerate((zone1, zone2, zone3, zone4), 1):
+            if not self._HEX6(zone):
+                log.error("Invalid hex color for zone %s: %s. Must be 6 hex characters.", i, zone)
                 return False
 
         # Validate brightness
         if not (0 <= brightness <= 100):
-            log.error(f"Invalid brightness. Must be between 0 and 100: {brightness}")
+            log.error("Invalid brightness. Must be between 0 and 100: %s", brightness)
             return False
 
         value = f"{zone1},{zone2},{zone3},{zone4},{brightness}"
         return self._write_file(
-            "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/four_zoned_kb/per_zone_mode",
+            self._paths["per_zone_mode"],
             value
         )
 
     def get_four_zone_mode(self) -> str:
         """Get four-zone mode configuration"""
-        if "four_zone_mode" not in self.available_features:
-            return ""
-
-        return self._read_file("/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/four_zoned_kb/four_zone_mode")
+        return self._read_feature("four_zone_mode")
 
     def set_four_zone_mode(self, mode: int, speed: int, brightness: int,
                            direction: int, red: int, green: int, blue: int) -> bool:
@@ -671,100 +981,237 @@ class DAMXManager:
         if "four_zone_mode" not in self.available_features:
             return False
 
-        # Validate values
-        if not (0 <= mode <= 7):
-            log.error(f"Invalid mode. Must be between 0 and 7: {mode}")
+        # Validate values in one branch; comparisons also accept float parameters
+        if not (0 <= mode <= 7 and 0 <= speed <= 9 and 0 <= brightness <= 100
+                and direction in (1, 2)
+                and 0 <= red <= 255 and 0 <= green <= 255 and 0 <= blue <= 255):
+            log.error("Invalid four-zone mode values: mode=%s (0-7), speed=%s (0-9), brightness=%s (0-100), "
+                      "direction=%s (1-2), rgb=%s,%s,%s (0-255)",
+                      mode, speed, brightness, direction, red, green, blue)
             return False
 
-        if not (0 <= speed <= 9):
-            log.error(f"Invalid speed. Must be between 0 and 9: {speed}")
-            return False
+        value = b"%d,%d,%d,%d,%d,%d,%d" % (mode, speed, brightness, direction, red, green, blue)
+        return self._write_bytes(self._paths["four_zone_mode"], value)
+
+    def get_static_settings(self) -> Dict:
+        """Get the settings that cannot change while this daemon instance runs"""
+        if self._static_settings is None:
+            self._static_settings = {
+                "laptop_type": self.laptop_type.name,
+                "has_four_zone_kb": self.has_four_zone_kb,
+                "available_features": list(self.available_features),
+                "version": VERSION,
+                "driver_version": self.get_driver_version()
+            }
+        return self._static_settings
 
-        if not (0 <= brightness <= 100):
-            log.error(f"Invalid brightness. Must be between 0 and 100: {brightness}")
-            return False
+    def get_all_settings(self) -> Dict:
+        """Get all DAMX-Daemon settings as a dictionary"""
+        settings = dict(self.get_static_settings())
+        settings.update(self.get_volatile_settings())
+        return settings
 
-        if direction not in [1, 2]:
-            log.error(f"Invalid direction. Must be 1 or 2: {direction}")
-            return False
+    def invalidate_settings_cache(self):
+        """Make the next settings request read the driver again"""
+        self._settings_cache = None
 
-        if not all(0 <= color <= 255 for color in [red, green, blue]):
-            log.error(f"Invalid RGB values. Must be between 0 and 255: {red},{green},{blue}")
-            return False
+    def get_volatile_settings(self) -> Dict:
+        """Get the settings that have to be read from the driver
 
-        value = f"{mode},{speed},{brightness},{direction},{red},{green},{blue}"
-        return self._write_file(
-            "/sys/module/linuwu_sense/drivers/platform:acer-wmi/acer-wmi/four_zoned_kb/four_zone_mode",
-            value
-        )
+        A snapshot is reused for SETTINGS_CACHE_TTL_MS, any write through the
+        manager or power source change drops it early.
+        """
+        settings = self._settings_cache
+        if settings is not None and time.monotonic_ns() < self._settings_cache_expiry:
+            return settings
 
-    def get_all_settings(self) -> Dict:
-        """Get all DAMX-Daemon settings as a dictionary"""
         settings = {
-            "laptop_type": self.laptop_type.name,
-            "has_four_zone_kb": self.has_four_zone_kb,
-            "available_features": list(self.available_features),
-            "version": VERSION,
-            "driver_version": self.get_driver_version(),
             "modprobe_parameter": self.current_modprobe_param
         }
 
-        # Only include thermal profile if available
-        if "thermal_profile" in self.available_features:
-            settings["thermal_profile"] = {
-                "current": self.get_thermal_profile(),
-                "available": self.get_thermal_profile_choices()
-            }
-        else:
-            # Include an empty entry for compatibility
+        feature_paths = self._paths
+
+        # Read every available attribute in a single pass
+        features = [name for name in feature_paths if name in self.available_features]
+        values = self._batch_read([feature_paths[name] for name in features])
+
+        for name in features:
+            value = values[feature_paths[name]]
+
+            if name == "thermal_profile":
+                settings["thermal_profile"] = {
+                    "current": value,
+                    "available": self.get_thermal_profile_choices()
+                }
+            elif name == "fan_speed":
+                cpu_fan, gpu_fan = self._split_fan_speed(value)
+                settings["fan_speed"] = {
+                    "cpu": cpu_fan,
+                    "gpu": gpu_fan
+                }
+            else:
+                settings[name] = value
+
+        # Include an empty thermal profile entry for compatibility
+        if "thermal_profile" not in settings:
             settings["thermal_profile"] = {
                 "current": "",
                 "available": []
             }
 
-        # Add all other features if available
-        if "backlight_timeout" in self.available_features:
-            settings["backlight_timeout"] = self.get_backlight_timeout()
+        self._settings_cache = settings
+        self._settings_cache_expiry = time.monotonic_ns() + self.SETTINGS_CACHE_TTL_MS * 1_000_000
+        return settings
 
-        if "battery_calibration" in self.available_features:
-            settings["battery_calibration"] = self.get_battery_calibration()
 
-        if "battery_limiter" in self.available_features:
-            settings["battery_limiter"] = self.get_battery_limiter()
+def _add_flag_accessors(cls, feature: str, label: str):
+    """Give cls a get_<feature>/set_<feature> pair for an on/off attribute"""
 
-        if "boot_animation_sound" in self.available_features:
-            settings["boot_animation_sound"] = self.get_boot_animation_sound()
+    def getter(self) -> str:
+        return self._read_feature(feature)
 
-        if "fan_speed" in self.available_features:
-            cpu_fan, gpu_fan = self.get_fan_speed()
-            settings["fan_speed"] = {
-                "cpu": cpu_fan,
-                "gpu": gpu_fan
-            }
+    def setter(self, enabled: bool) -> bool:
+        return self._write_flag(feature, enabled)
 
-        if "lcd_override" in self.available_features:
-            settings["lcd_override"] = self.get_lcd_override()
+    for func, name, doc in ((getter, f"get_{feature}", f"Get {label} status"),
+                            (setter, f"set_{feature}", f"Set {label} status")):
+        func.__name__ = name
+        func.__qualname__ = f"{cls.__name__}.{name}"
+        func.__doc__ = doc
+        setattr(cls, name, func)
 
-        if "usb_charging" in self.available_features:
-            settings["usb_charging"] = self.get_usb_charging()
 
-        if "per_zone_mode" in self.available_features:
-            settings["per_zone_mode"] = self.get_per_zone_mode()
+for _feature, _label in DAMXManager.FLAG_FEATURES.items():
+    _add_flag_accessors(DAMXManager, _feature, _label)
 
-        if "four_zone_mode" in self.available_features:
-            settings["four_zone_mode"] = self.get_four_zone_mode()
 
-        return settings
+class PreEncodedJSON(bytes):
+    """A response that has already been serialized to JSON"""
+
+
+class DeferredResponse:
+    """A command whose handler waits on subprocesses, answered off the event loop"""
+
+    __slots__ = ("command", "handler", "params")
+
+    def __init__(self, command: str, handler: Callable[[Dict], Dict], params: Dict):
+        self.command = command
+        self.handler = handler
+        self.params = params
+
+
+def _is_int(value) -> bool:
+    """True for a request integer, JSON true/false decode to bool and do not count"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def requires_feature(feature: str, label: str):
+    """Make a DaemonServer handler refuse requests for a feature this laptop lacks"""
+    # Built once; every refused request returns this same response
+    unsupported = {
+        "success": False,
+        "error": f"{label} is not supported on this device"
+    }
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(self, params: Dict) -> Dict:
+            if feature not in self.manager.available_features:
+                return unsupported
+            return handler(self, params)
+        return wrapper
+    return decorator
 
 
 class DaemonServer:
     """Unix Socket server for IPC with the GUI client"""
 
+    # Commands that shell out to rmmod/modprobe/systemctl and can take seconds
+    BLOCKING_COMMANDS = frozenset({
+        "force_nitro_model",
+        "force_predator_model",
+        "force_enable_all",
+        "set_modprobe_parameter_nitro",
+        "set_modprobe_parameter_predator",
+        "set_modprobe_parameter_enable_all",
+        "restart_daemon",
+        "restart_drivers_and_daemon",
+    })
+    # Minimum spacing between two runs of the same blocking command
+    BLOCKING_COMMAND_INTERVAL_NS = 1_000_000_000
+    # How long each set_fan_curve point is held, unless the request gives hold_ms
+    FAN_CURVE_HOLD_MS = 1000
+    FAN_CURVE_MIN_HOLD_MS = 100
+
     def __init__(self, manager: DAMXManager):
         self.manager = manager
         self.socket = None
         self.running = False
-        self.clients = []
+        self.selector = None
+        # fd -> (client socket, receive buffer, pending send buffer)
+        self.clients = {}
+        # command name -> handler taking the request params
+        self._handlers = self._build_handlers()
+        # Blocking command -> monotonic time it was last started
+        self._last_run_ns = {}
+        self._rate_limited_response = {
+            "success": False,
+            "error": "Command was run less than a second ago, try again shortly"
+        }
+        self._invalid_request_response = {
+            "success": False,
+            "error": "Invalid request"
+        }
+
+        # Extra fds served by the event loop: file object -> callback
+        self._readers = {}
+        # [next due (monotonic seconds), interval or None for call_later, callback] run by the event loop
+        self._periodic = []
+        # call_later handle for the next point of a running set_fan_curve
+        self._fan_curve_call = None
+        # Clients waiting on a deferred response; their later requests queue up behind it
+        self._busy_clients = set()
+        # (client socket, framing, response) posted by finished command threads
+        self._finished = queue.SimpleQueue()
+
+        # get_all_settings responses start with the serialized static settings;
+        # only the volatile part is encoded per request and spliced in
+        self._settings_prefix = _encode({
+            "success": True,
+            "data": manager.get_static_settings()
+        })[:-2]
+
+        # Responses that are fixed for the life of this daemon instance
+        static = manager.get_static_settings()
+        self._version_response = PreEncodedJSON(_encode({
+            "success": True,
+            "data": {
+                "version": VERSION
+            }
+        }))
+        self._features_response = PreEncodedJSON(_encode({
+            "success": True,
+            "data": {
+                "available_features": static["available_features"],
+                "laptop_type": static["laptop_type"],
+                "has_four_zone_kb": static["has_four_zone_kb"]
+            }
+        }))
+
+        # Reused for every binary frame header we send
+        self._frame_header = bytearray(FRAME_HEADER.size)
+
+        # Scratch receive buffer shared by all clients, the loop is single-threaded
+        self._recv_buf = bytearray(4096)
+        self._recv_view = memoryview(self._recv_buf)
+
+        # Wakes the event loop for shutdown and finished commands: one eventfd where available, a self-pipe otherwise
+        if hasattr(os, "eventfd"):
+            self._wake_r = self._wake_w = os.eventfd(0, os.EFD_CLOEXEC | os.EFD_NONBLOCK)
+        else:
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            os.set_blocking(self._wake_w, False)
 
     def start(self):
         """Start the Unix socket server"""
@@ -773,7 +1220,7 @@ class DaemonServer:
             if os.path.exists(SOCKET_PATH):
                 os.unlink(SOCKET_PATH)
         except OSError as e:
-            log.error(f"Failed to remove existing socket: {e}")
+            log.error("Failed to remove existing socket: %s", e)
             return False
 
         try:
@@ -781,31 +1228,39 @@ class DaemonServer:
             self.socket.bind(SOCKET_PATH)
             # Ensure socket permissions allow non-root access
             os.chmod(SOCKET_PATH, 0o666)
-            self.socket.listen(5)
-            self.socket.settimeout(1)  # 1 second timeout for clean shutdown
+            self.socket.listen(socket.SOMAXCONN)
+            self.socket.setblocking(False)
+
+            # All clients are served from this thread through one selector
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.socket, selectors.EVENT_READ, self._accept_client)
+            self.selector.register(self._wake_r, selectors.EVENT_READ, self._drain_wakeup)
+            for fileobj in self._readers:
+                self.selector.register(fileobj, selectors.EVENT_READ, self._run_reader)
             self.running = True
 
-            log.info(f"Server listening on {SOCKET_PATH}")
+            log.info("Server listening on %s", SOCKET_PATH)
 
-            # Accept connections in a loop
             while self.running:
-                try:
-                    client, _ = self.socket.accept()
-                    client_thread = threading.Thread(target=self.handle_client, args=(client,))
-                    client_thread.daemon = True
-                    client_thread.start()
-                    self.clients.append((client, client_thread))
-                except socket.timeout:
-                    # This is expected due to the timeout
-                    continue
-                except Exception as e:
-                    if self.running:  # Only log if not shutting down
-                        log.error(f"Error accepting connection: {e}")
+                timeout = None
+                if self._periodic:
+                    timeout = max(0.0, min(entry[0] for entry in self._periodic) - time.monotonic())
+
+                # Sleeps until a client or the wake pipe has something for us
+                for key, mask in self.selector.select(timeout):
+                    try:
+                        key.data(key.fileobj, mask)
+                    except Exception as e:
+                        if self.running:  # Only log if not shutting down
+                            log.error("Error handling socket event: %s", e)
+
+                if self._periodic:
+                    self._run_periodic()
 
             return True
 
         except Exception as e:
-            log.error(f"Failed to start server: {e}")
+            log.error("Failed to start server: %s", e)
             return False
 
     def stop(self):
@@ -814,11 +1269,26 @@ class DaemonServer:
         self.running = False
     
         # Close all client connections
-        for client, _ in self.clients:
+        for client, _, _ in list(self.clients.values()):
             try:
                 client.close()
             except:
                 pass
+        self.clients.clear()
+
+        if self.selector:
+            try:
+                self.selector.close()
+            except:
+                pass
+
+        for fd in {self._wake_r, self._wake_w}:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+        self.manager.close_fds()
     
         # Close server socket
         if self.socket:
@@ -835,414 +1305,722 @@ class DaemonServer:
         try:
             if os.path.exists(SOCKET_PATH):
                 os.unlink(SOCKET_PATH)
-                log.info(f"Removed socket file: {SOCKET_PATH}")
+                log.info("Removed socket file: %s", SOCKET_PATH)
         except Exception as e:
-            log.error(f"Failed to remove socket file: {e}")
+            log.error("Failed to remove socket file: %s", e)
 
+    def wakeup(self):
+        """Interrupt the event loop; safe to call from a signal handler"""
+        try:
+            # An eventfd takes an 8-byte counter increment, a pipe any bytes
+            os.write(self._wake_w, _WAKE_BYTES)
+        except (BlockingIOError, OSError):
+            pass
 
-    def handle_client(self, client_socket):
-        """Handle communication with a client"""
+    def add_reader(self, fileobj, callback: Callable[[], None]):
+        """Call callback from the event loop whenever fileobj is readable
+
+        Call before start() or from the event loop thread.
+        """
+        self._readers[fileobj] = callback
+        if self.selector:
+            self.selector.register(fileobj, selectors.EVENT_READ, self._run_reader)
+
+    def remove_reader(self, fileobj):
+        """Stop watching a file object added with add_reader"""
+        if self._readers.pop(fileobj, None) is not None and self.selector:
+            try:
+                self.selector.unregister(fileobj)
+            except (KeyError, ValueError):
+                pass
+
+    def _run_reader(self, fileobj, mask):
+        """Dispatch readiness on an add_reader file object"""
+        self._readers[fileobj]()
+
+    def call_every(self, interval: float, callback: Callable[[], None]):
+        """Call callback from the event loop every interval seconds
+
+        Call before start() or from the event loop thread.
+        """
+        self._periodic.append([time.monotonic() + interval, interval, callback])
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> List:
+        """Call callback once from the event loop after delay seconds
+
+        Call from the event loop thread. Returns a handle for cancel_call.
+        """
+        entry = [time.monotonic() + delay, None, callback]
+        self._periodic.append(entry)
+        return entry
+
+    def cancel_call(self, handle: List):
+        """Cancel a call_later callback that has not run yet"""
         try:
-            while self.running:
-                # Receive data from client
-                data = client_socket.recv(4096)
-                if not data:
-                    break
+            self._periodic.remove(handle)
+        except ValueError:
+            pass
 
+    def _run_periodic(self):
+        """Run the call_every and call_later callbacks that are due"""
+        now = time.monotonic()
+        # Callbacks may schedule or cancel calls
+        for entry in list(self._periodic):
+            if entry[0] <= now:
+                if entry[1] is None:
+                    self._periodic.remove(entry)
+                else:
+                    entry[0] = now + entry[1]
                 try:
-                    # Parse JSON request
-                    request = json.loads(data.decode('utf-8'))
-                    command = request.get("command", "")
-                    params = request.get("params", {})
+                    entry[2]()
+                except Exception as e:
+                    log.error("Error in periodic task: %s", e)
+
+    def _drain_wakeup(self, wake_fd, mask):
+        """Reset the wake-up fd and deliver responses from finished commands"""
+        try:
+            while os.read(wake_fd, 512):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
 
-                    # Process command
-                    response = self.process_command(command, params)
+        while True:
+            try:
+                client_socket, framing, response = self._finished.get_nowait()
+            except queue.Empty:
+                return
+            self._busy_clients.discard(client_socket)
+            entry = self.clients.get(client_socket.fileno())
+            if entry is None or entry[0] is not client_socket:
+                continue  # Client went away while the command ran
+            self._send_response(client_socket, self._encode_response(response, framing))
+            if client_socket.fileno() in self.clients:
+                self._process_requests(client_socket)
+
+    def _run_deferred(self, client_socket, framing, deferred: DeferredResponse):
+        """Run a blocking command in its own thread and post the result to the loop"""
+        def run():
+            try:
+                response = deferred.handler(deferred.params)
+            except Exception as e:
+                log.error("Error processing command %s: %s", deferred.command, e, exc_info=True)
+                response = {
+                    "success": False,
+                    "error": str(e)
+                }
+            self._finished.put((client_socket, framing, response))
+            self.wakeup()
 
-                    # Send response
-                    client_socket.sendall(json.dumps(response).encode('utf-8'))
+        self._busy_clients.add(client_socket)
+        threading.Thread(target=run, name=f"DAMX-{deferred.command}", daemon=True).start()
 
-                except json.JSONDecodeError:
-                    log.error("Invalid JSON received")
-                    client_socket.sendall(json.dumps({
-                        "success": False,
-                        "error": "Invalid JSON format"
-                    }).encode('utf-8'))
-                except Exception as e:
-                    log.error(f"Error processing request: {e}")
-                    log.error(traceback.format_exc())
-                    client_socket.sendall(json.dumps({
-                        "success": False,
-                        "error": str(e)
-                    }).encode('utf-8'))
+    def _accept_client(self, server_socket, mask):
+        """Accept every pending connection and start watching them for requests
 
-        except Exception as e:
-            if self.running:  # Only log if not shutting down
-                log.error(f"Client connection error: {e}")
-        finally:
+        The backlog is drained in one go so a burst of clients costs a single
+        wakeup, and each new client is read right away since its request has
+        usually arrived together with the connection.
+        """
+        while True:
             try:
-                client_socket.close()
-            except:
-                pass
+                client, _ = server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                log.error("Failed to accept client: %s", e)
+                return
+
+            client.setblocking(False)
+            # Room for a full settings response so replies rarely wait for writability
+            client.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)
+            self.clients[client.fileno()] = (client, bytearray(), bytearray())
+            self.selector.register(client, selectors.EVENT_READ, self._service_client)
+            self.handle_client(client)
+
+    def _close_client(self, client_socket):
+        """Stop watching a client and close its connection"""
+        self.clients.pop(client_socket.fileno(), None)
+        self._busy_clients.discard(client_socket)
+        try:
+            self.selector.unregister(client_socket)
+        except (KeyError, ValueError):
+            pass
+        try:
+            client_socket.close()
+        except:
+            pass
 
-    def process_command(self, command: str, params: Dict) -> Dict:
-        """Process a command from the client"""
-        log.info(f"Processing command: {command} with params: {params}")
+    def _service_client(self, client_socket, mask):
+        """Handle readiness events on a client connection"""
+        if mask & selectors.EVENT_WRITE:
+            self._flush_client(client_socket)
+        if mask & selectors.EVENT_READ:
+            self.handle_client(client_socket)
+
+    def handle_client(self, client_socket):
+        """Read whatever the client sent and answer every complete request"""
+        _, buffer, _ = self.clients[client_socket.fileno()]
 
         try:
-            if command == "get_all_settings":
-                settings = self.manager.get_all_settings()
-                return {
-                    "success": True,
-                    "data": settings
-                }
+            received = client_socket.recv_into(self._recv_buf)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            if self.running:  # Only log if not shutting down
+                log.error("Client connection error: %s", e)
+            self._close_client(client_socket)
+            return
 
-            elif command == "get_thermal_profile":
-                # Check if feature is available
-                if "thermal_profile" not in self.manager.available_features:
-                    return {
-                        "success": False,
-                        "error": "Thermal profile is not supported on this device"
-                    }
+        if not received:
+            self._close_client(client_socket)
+            return
 
-                profile = self.manager.get_thermal_profile()
-                choices = self.manager.get_thermal_profile_choices()
-                return {
-                    "success": True,
-                    "data": {
-                        "current": profile,
-                        "available": choices
-                    }
-                }
+        buffer += self._recv_view[:received]
+        if client_socket not in self._busy_clients:
+            self._process_requests(client_socket)
 
-            elif command == "set_thermal_profile":
-                # Check if feature is available
-                if "thermal_profile" not in self.manager.available_features:
-                    return {
-                        "success": False,
-                        "error": "Thermal profile is not supported on this device"
-                    }
+    def _process_requests(self, client_socket):
+        """Answer complete requests in order, pausing behind a deferred one"""
+        _, buffer, _ = self.clients[client_socket.fileno()]
+        try:
+            for request, framing in self._extract_requests(buffer):
+                response = self.handle_request(request, framing)
+                if isinstance(response, DeferredResponse):
+                    # The rest of the buffer waits until this reply has been sent
+                    self._run_deferred(client_socket, framing, response)
+                    return
+                self._send_response(client_socket, self._encode_response(response, framing))
+        except ValueError as e:
+            log.error("Dropping client: %s", e)
+            self._close_client(client_socket)
+
+    def _extract_requests(self, buffer: bytearray):
+        """Split complete requests off the front of a client's receive buffer
+
+        Yields (payload, framing) pairs, where framing is the frame magic byte
+        for binary frames or the text terminator to echo back. The payload is
+        the raw request bytes, or the decoded request for bare JSON. Binary frames
+        start with a FRAME_HEADER. Text requests are newline terminated; older
+        clients send bare JSON objects, so complete documents at the front of
+        an unterminated buffer are accepted as well.
+        """
+        while buffer:
+            if buffer[0] in (FRAME_MAGIC_JSON, FRAME_MAGIC_MSGPACK):
+                if len(buffer) < FRAME_HEADER.size:
+                    return
+                magic, length = FRAME_HEADER.unpack_from(buffer)
+                if length > MAX_FRAME_SIZE:
+                    raise ValueError(f"frame of {length} bytes exceeds limit")
+                end = FRAME_HEADER.size + length
+                if len(buffer) < end:
+                    return
+                request = buffer[FRAME_HEADER.size:end]
+                del buffer[:end]
+                yield request, magic
+                continue
+
+            newline = buffer.find(b"\n")
+            if newline >= 0:
+                request = buffer[:newline]
+                del buffer[:newline + 1]
+                if request.strip():
+                    yield request, b"\n"
+                continue
+
+            if len(buffer) > MAX_FRAME_SIZE:
+                raise ValueError(f"unterminated request of {len(buffer)} bytes exceeds limit")
 
-                profile = params.get("profile", "")
-                success = self.manager.set_thermal_profile(profile)
-                return {
-                    "success": success,
-                    "data": {"profile": profile} if success else None,
-                    "error": "Failed to set thermal profile" if not success else None
-                }
+            try:
+                text = buffer.decode('utf-8')
+            except UnicodeDecodeError as e:
+                if e.reason == "unexpected end of data":
+                    # A multi-byte character split across reads
+                    return
+                text = None
+
+            start = len(text) - len(text.lstrip()) if text is not None else 0
+            if text is not None and start < len(text):
+                # The completeness check already parses the document, hand that
+                # over instead of the raw bytes so it is not decoded twice.
+                # raw_decode takes one document at a time, as a single read can
+                # hold several requests from a client writing them back to back.
+                try:
+                    # Always the stdlib decoder here, its error positions and
+                    # messages tell a truncated document from a malformed one
+                    request, end = _json_decoder.raw_decode(text, start)
+                except json.JSONDecodeError as e:
+                    # Wait for the rest of a partially received document
+                    doc_end = len(text.rstrip())
+                    if e.pos >= doc_end or e.msg.startswith("Unterminated string"):
+                        return
+                else:
+                    # Whitespace between documents goes with the one before it
+                    end = len(text) - len(text[end:].lstrip())
+                    del buffer[:len(text[:end].encode('utf-8'))]
+                    yield request, b""
+                    continue
+
+            # Malformed, or whitespace alone: answered as invalid JSON rather than left waiting
+            request = bytes(buffer)
+            buffer.clear()
+            yield request, b""
+            return
 
-            elif command == "set_backlight_timeout":
-                # Check if feature is available
-                if "backlight_timeout" not in self.manager.available_features:
+    def handle_request(self, data, framing=b"") -> Dict:
+        """Decode a single request and build its response"""
+        try:
+            if framing == FRAME_MAGIC_MSGPACK:
+                if msgpack is None:
                     return {
                         "success": False,
-                        "error": "Backlight timeout is not supported on this device"
+                        "error": "msgpack framing is not supported by this daemon"
                     }
+                request = msgpack.unpackb(data)
+            elif isinstance(data, (bytes, bytearray)):
+                # Parse JSON request
+                request = _decode(data)
+            else:
+                # Bare JSON request, already decoded while framing it
+                request = data
+        except Exception as e:
+            # Malformed JSON or msgpack, including text that is not UTF-8
+            log.error("Invalid request received: %s", e)
+            return {
+                "success": False,
+                "error": "Invalid JSON format" if framing != FRAME_MAGIC_MSGPACK else "Invalid msgpack format"
+            }
 
-                enabled = params.get("enabled", False)
-                success = self.manager.set_backlight_timeout(enabled)
-                return {
-                    "success": success,
-                    "data": {"enabled": enabled} if success else None,
-                    "error": "Failed to set backlight timeout" if not success else None
-                }
+        # Well-formed, but it still has to be {"command": str, "params": {...}}
+        if not isinstance(request, dict):
+            log.error("Invalid request received: not an object")
+            return self._invalid_request_response
+        command = request.get("command", "")
+        params = request.get("params", {})
+        if not isinstance(command, str) or not isinstance(params, dict):
+            log.error("Invalid request received: bad command or params")
+            return self._invalid_request_response
+
+        # Process command
+        return self.process_command(command, params)
+
+    def _encode_response(self, response: Dict, framing) -> List[bytes]:
+        """Serialize a response into send buffers using the same framing as its request"""
+        if framing == FRAME_MAGIC_MSGPACK and msgpack is not None:
+            if isinstance(response, PreEncodedJSON):
+                response = _decode(response)
+            body = msgpack.packb(response)
+        elif isinstance(response, PreEncodedJSON):
+            body = response
+        else:
+            body = _encode(response)
+
+        if isinstance(framing, int):
+            magic = framing if msgpack is not None else FRAME_MAGIC_JSON
+            FRAME_HEADER.pack_into(self._frame_header, 0, magic, len(body))
+            return [self._frame_header, body]
+        return [body, framing] if framing else [body]
+
+    def _send_response(self, client_socket, buffers: List[bytes]):
+        """Send a response with one scatter-gather write, queueing what the socket does not accept"""
+        _, _, pending = self.clients[client_socket.fileno()]
+
+        if pending:
+            # Preserve ordering behind the response that is still in flight
+            for buf in buffers:
+                pending += buf
+        else:
+            try:
+                sent = client_socket.sendmsg(buffers)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError as e:
+                if self.running:  # Only log if not shutting down
+                    log.error("Client connection error: %s", e)
+                self._close_client(client_socket)
+                return
+
+            for buf in buffers:
+                if sent >= len(buf):
+                    sent -= len(buf)
+                    continue
+                pending += memoryview(buf)[sent:]
+                sent = 0
 
-            elif command == "set_battery_calibration":
-                # Check if feature is available
-                if "battery_calibration" not in self.manager.available_features:
-                    return {
-                        "success": False,
-                        "error": "Battery calibration is not supported on this device"
-                    }
+        self._flush_client(client_socket)
 
-                enabled = params.get("enabled", False)
-                success = self.manager.set_battery_calibration(enabled)
-                return {
-                    "success": success,
-                    "data": {"enabled": enabled} if success else None,
-                    "error": "Failed to set battery calibration" if not success else None
-                }
+    def _flush_client(self, client_socket):
+        """Write pending response bytes, waiting for writability if the socket is full"""
+        entry = self.clients.get(client_socket.fileno())
+        if entry is None:
+            return
+        _, _, pending = entry
 
-            elif command == "set_battery_limiter":
-                # Check if feature is available
-                if "battery_limiter" not in self.manager.available_features:
-                    return {
-                        "success": False,
-                        "error": "Battery limiter is not supported on this device"
-                    }
+        try:
+            while pending:
+                sent = client_socket.send(pending)
+                del pending[:sent]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError as e:
+            if self.running:  # Only log if not shutting down
+                log.error("Client connection error: %s", e)
+            self._close_client(client_socket)
+            return
+
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if pending else 0)
+        if self.selector.get_key(client_socket).events != events:
+            self.selector.modify(client_socket, events, self._service_client)
+
+    def _build_handlers(self) -> Dict[str, Callable[[Dict], Dict]]:
+        """Map every command name to the method that serves it"""
+        handlers = {
+            f"set_{feature}": self._flag_handler(feature)
+            for feature in self.manager.FLAG_FEATURES
+        }
+        handlers.update({
+            "get_all_settings": self._h_get_all_settings,
+            "get_thermal_profile": self._h_get_thermal_profile,
+            "set_thermal_profile": self._h_set_thermal_profile,
+            "set_fan_speed": self._h_set_fan_speed,
+            "set_fan_curve": self._h_set_fan_curve,
+            "set_usb_charging": self._h_set_usb_charging,
+            "set_per_zone_mode": self._h_set_per_zone_mode,
+            "set_four_zone_mode": self._h_set_four_zone_mode,
+            "get_supported_features": self._h_get_supported_features,
+            "get_version": self._h_get_version,
+            # Force Models and Features
+            "force_nitro_model": self._h_force_nitro_model,
+            "force_predator_model": self._h_force_predator_model,
+            "force_enable_all": self._h_force_enable_all,
+            "get_modprobe_parameter": self._h_get_modprobe_parameter,
+            # Force Model and Parameters Permanantly
+            "set_modprobe_parameter_nitro": self._h_set_modprobe_parameter_nitro,
+            "set_modprobe_parameter_predator": self._h_set_modprobe_parameter_predator,
+            "set_modprobe_parameter_enable_all": self._h_set_modprobe_parameter_enable_all,
+            "remove_modprobe_parameter": self._h_remove_modprobe_parameter,
+            "restart_daemon": self._h_restart_daemon,
+            "restart_drivers_and_daemon": self._h_restart_drivers_and_daemon,
+        })
+        for command in self.BLOCKING_COMMANDS:
+            handlers[command] = functools.partial(self._defer, command, handlers[command])
+        return handlers
+
+    def _defer(self, command: str, handler: Callable[[Dict], Dict], params: Dict):
+        """Schedule a blocking command, refusing repeats that come in too quickly"""
+        now = time.monotonic_ns()
+        last = self._last_run_ns.get(command)
+        if last is not None and now - last < self.BLOCKING_COMMAND_INTERVAL_NS:
+            log.warning("Ignoring %s, it was run less than a second ago", command)
+            return self._rate_limited_response
+        self._last_run_ns[command] = now
+        return DeferredResponse(command, handler, params)
+
+    def process_command(self, command: str, params: Dict) -> Union[Dict, DeferredResponse]:
+        """Process a command from the client"""
+        log.info("Processing command: %s with params: %s", command, params)
 
-                enabled = params.get("enabled", False)
-                success = self.manager.set_battery_limiter(enabled)
+        try:
+            handler = self._handlers.get(command)
+            if handler is None:
                 return {
-                    "success": success,
-                    "data": {"enabled": enabled} if success else None,
-                    "error": "Failed to set battery limiter" if not success else None
+                    "success": False,
+                    "error": f"Unknown command: {command}"
                 }
+            return handler(params)
 
-            elif command == "set_boot_animation_sound":
-                # Check if feature is available
-                if "boot_animation_sound" not in self.manager.available_features:
-                    return {
-                        "success": False,
-                        "error": "Boot animation sound is not supported on this device"
-                    }
+        except Exception as e:
+            log.error("Error processing command %s: %s", command, e, exc_info=True)
+            return {
+                "success": False,
+                "error": str(e)
+            }
 
-                enabled = params.get("enabled", False)
-                success = self.manager.set_boot_animation_sound(enabled)
-                return {
-                    "success": success,
-                    "data": {"enabled": enabled} if success else None,
-                    "error": "Failed to set boot animation sound" if not success else None
-                }
+    def _h_get_all_settings(self, params: Dict) -> PreEncodedJSON:
+        volatile = _encode(self.manager.get_volatile_settings())
+        return PreEncodedJSON(self._settings_prefix + b"," + volatile[1:] + b"}")
+
+    @requires_feature("thermal_profile", "Thermal profile")
+    def _h_get_thermal_profile(self, params: Dict) -> Dict:
+        profile = self.manager.get_thermal_profile()
+        choices = self.manager.get_thermal_profile_choices()
+        return {
+            "success": True,
+            "data": {
+                "current": profile,
+                "available": choices
+            }
+        }
 
-            elif command == "set_fan_speed":
-                # Check if feature is available
-                if "fan_speed" not in self.manager.available_features:
-                    return {
-                        "success": False,
-                        "error": "Fan speed control is not supported on this device"
-                    }
+    @requires_feature("thermal_profile", "Thermal profile")
+    def _h_set_thermal_profile(self, params: Dict) -> Dict:
+        profile = params.get("profile", "")
+        success = self.manager.set_thermal_profile(profile)
+        return {
+            "success": success,
+            "data": {"profile": profile} if success else None,
+            "error": "Failed to set thermal profile" if not success else None
+        }
 
-                cpu = params.get("cpu", 0)
-                gpu = params.get("gpu", 0)
-                success = self.manager.set_fan_speed(cpu, gpu)
-                return {
-                    "success": success,
-                    "data": {"cpu": cpu, "gpu": gpu} if success else None,
-                    "error": "Failed to set fan speed" if not success else None
-                }
+    def _flag_handler(self, feature: str) -> Callable[[Dict], Dict]:
+        """Build the set_<feature> handler for an on/off feature, gated by requires_feature"""
+        label = self.manager.FLAG_FEATURES[feature]
+        setter = getattr(self.manager, f"set_{feature}")
 
-            elif command == "set_lcd_override":
-                # Check if feature is available
-                if "lcd_override" not in self.manager.available_features:
-                    return {
-                        "success": False,
-                        "error": "LCD override is not supported on this device"
-                    }
+        @requires_feature(feature, f"{label[:1].upper()}{label[1:]}")
+        def handler(server, params: Dict) -> Dict:
+            enabled = params.get("enabled", False)
+            success = setter(enabled)
+            return {
+                "success": success,
+                "data": {"enabled": enabled} if success else None,
+                "error": f"Failed to set {label}" if not success else None
+            }
 
-                enabled = params.get("enabled", False)
-                success = self.manager.set_lcd_override(enabled)
-                return {
-                    "success": success,
-                    "data": {"enabled": enabled} if success else None,
-                    "error": "Failed to set LCD override" if not success else None
-                }
+        return functools.partial(handler, self)
+
+    @requires_feature("fan_speed", "Fan speed control")
+    def _h_set_fan_speed(self, params: Dict) -> Dict:
+        cpu = params.get("cpu", 0)
+        gpu = params.get("gpu", 0)
+        self._cancel_fan_curve()
+        success = self.manager.set_fan_speed(cpu, gpu)
+        return {
+            "success": success,
+            "data": {"cpu": cpu, "gpu": gpu} if success else None,
+            "error": "Failed to set fan speed" if not success else None
+        }
 
-            elif command == "set_usb_charging":
-                # Check if feature is available
-                if "usb_charging" not in self.manager.available_features:
-                    return {
-                        "success": False,
-                        "error": "USB charging control is not supported on this device"
-                    }
+    @requires_feature("fan_speed", "Fan speed control")
+    def _h_set_fan_curve(self, params: Dict) -> Dict:
+        points = self._parse_fan_curve(params.get("points"))
+        if points is None:
+            return {
+                "success": False,
+                "error": "Fan curve points must be a non-empty list of [cpu, gpu] integer pairs"
+            }
 
-                level = params.get("level", 0)
-                success = self.manager.set_usb_charging(level)
-                return {
-                    "success": success,
-                    "data": {"level": level} if success else None,
-                    "error": "Failed to set USB charging" if not success else None
-                }
+        hold_ms = params.get("hold_ms", self.FAN_CURVE_HOLD_MS)
+        if not _is_int(hold_ms) or hold_ms < self.FAN_CURVE_MIN_HOLD_MS:
+            return {
+                "success": False,
+                "error": f"hold_ms must be an integer of at least {self.FAN_CURVE_MIN_HOLD_MS}"
+            }
 
-            elif command == "set_per_zone_mode":
-                # Check if feature is available
-                if "per_zone_mode" not in self.manager.available_features:
-                    return {
-                        "success": False,
-                        "error": "Per-zone keyboard mode is not supported on this device"
-                    }
+        self._cancel_fan_curve()
+        success = self.manager.set_fan_curve(points)
+        if success and len(points) > 1:
+            self._schedule_fan_curve(points[1:], hold_ms / 1000)
+        return {
+            "success": success,
+            "data": {"points": [list(point) for point in points], "hold_ms": hold_ms} if success else None,
+            "error": "Failed to set fan curve" if not success else None
+        }
 
-                zone1 = params.get("zone1", "000000")
-                zone2 = params.get("zone2", "000000")
-                zone3 = params.get("zone3", "000000")
-                zone4 = params.get("zone4", "000000")
-                brightness = params.get("brightness", 100)
-                success = self.manager.set_per_zone_mode(zone1, zone2, zone3, zone4, brightness)
-                return {
-                    "success": success,
-                    "data": {
-                        "zone1": zone1,
-                        "zone2": zone2,
-                        "zone3": zone3,
-                        "zone4": zone4,
-                        "brightness": brightness
-                    } if success else None,
-                    "error": "Failed to set per-zone mode" if not success else None
-                }
+    @staticmethod
+    def _parse_fan_curve(points) -> Union[List[Tuple[int, int]], None]:
+        """(cpu, gpu) tuples from a request's points, None unless all are integer pairs"""
+        if not isinstance(points, (list, tuple)) or not points:
+            return None
+        parsed = []
+        for point in points:
+            if not isinstance(point, (list, tuple)) or len(point) != 2:
+                return None
+            cpu, gpu = point
+            if not (_is_int(cpu) and _is_int(gpu)):
+                return None
+            parsed.append((cpu, gpu))
+        return parsed
+
+    def _schedule_fan_curve(self, points: List[Tuple[int, int]], hold: float):
+        """Apply the next point of a fan curve after hold seconds, then the rest in turn"""
+        def apply_next():
+            self._fan_curve_call = None
+            cpu, gpu = points[0]
+            if not self.manager.set_fan_speed(cpu, gpu):
+                log.error("Fan curve stopped, failed to set fan speed: cpu=%s, gpu=%s", cpu, gpu)
+            elif len(points) > 1:
+                self._schedule_fan_curve(points[1:], hold)
+
+        self._fan_curve_call = self.call_later(hold, apply_next)
+
+    def _cancel_fan_curve(self):
+        """Drop the remaining points of a running fan curve, a newer fan setting wins"""
+        if self._fan_curve_call is not None:
+            self.cancel_call(self._fan_curve_call)
+            self._fan_curve_call = None
+
+    @requires_feature("usb_charging", "USB charging control")
+    def _h_set_usb_charging(self, params: Dict) -> Dict:
+        level = params.get("level", 0)
+        success = self.manager.set_usb_charging(level)
+        return {
+            "success": success,
+            "data": {"level": level} if success else None,
+            "error": "Failed to set USB charging" if not success else None
+        }
 
-            elif command == "set_four_zone_mode":
-                # Check if feature is available
-                if "four_zone_mode" not in self.manager.available_features:
-                    return {
-                        "success": False,
-                        "error": "Four-zone keyboard mode is not supported on this device"
-                    }
+    @requires_feature("per_zone_mode", "Per-zone keyboard mode")
+    def _h_set_per_zone_mode(self, params: Dict) -> Dict:
+        zone1 = params.get("zone1", "000000")
+        zone2 = params.get("zone2", "000000")
+        zone3 = params.get("zone3", "000000")
+        zone4 = params.get("zone4", "000000")
+        brightness = params.get("brightness", 100)
+        success = self.manager.set_per_zone_mode(zone1, zone2, zone3, zone4, brightness)
+        return {
+            "success": success,
+            "data": {
+                "zone1": zone1,
+                "zone2": zone2,
+                "zone3": zone3,
+                "zone4": zone4,
+                "brightness": brightness
+            } if success else None,
+            "error": "Failed to set per-zone mode" if not success else None
+        }
 
-                mode = params.get("mode", 0)
-                speed = params.get("speed", 0)
-                brightness = params.get("brightness", 100)
-                direction = params.get("direction", 1)
-                red = params.get("red", 0)
-                green = params.get("green", 0)
-                blue = params.get("blue", 0)
-                success = self.manager.set_four_zone_mode(mode, speed, brightness, direction, red, green, blue)
-                return {
-                    "success": success,
-                    "data": {
-                        "mode": mode,
-                        "speed": speed,
-                        "brightness": brightness,
-                        "direction": direction,
-                        "red": red,
-                        "green": green,
-                        "blue": blue
-                    } if success else None,
-                    "error": "Failed to set four-zone mode" if not success else None
-                }
+    @requires_feature("four_zone_mode", "Four-zone keyboard mode")
+    def _h_set_four_zone_mode(self, params: Dict) -> Dict:
+        mode = params.get("mode", 0)
+        speed = params.get("speed", 0)
+        brightness = params.get("brightness", 100)
+        direction = params.get("direction", 1)
+        red = params.get("red", 0)
+        green = params.get("green", 0)
+        blue = params.get("blue", 0)
+        success = self.manager.set_four_zone_mode(mode, speed, brightness, direction, red, green, blue)
+        return {
+            "success": success,
+            "data": {
+                "mode": mode,
+                "speed": speed,
+                "brightness": brightness,
+                "direction": direction,
+                "red": red,
+                "green": green,
+                "blue": blue
+            } if success else None,
+            "error": "Failed to set four-zone mode" if not success else None
+        }
 
-            elif command == "get_supported_features":
-                return {
-                    "success": True,
-                    "data": {
-                        "available_features": list(self.manager.available_features),
-                        "laptop_type": self.manager.laptop_type.name,
-                        "has_four_zone_kb": self.manager.has_four_zone_kb
-                    }
-                }
+    def _h_get_supported_features(self, params: Dict) -> PreEncodedJSON:
+        return self._features_response
 
-            elif command == "get_version":
-                return {
-                    "success": True,
-                    "data": {
-                        "version": VERSION
-                    }
-                }
-            
-            # Force Models and Features
-            elif command == "force_nitro_model":
-                # Force Nitro model into driver
-                success = self.manager._force_model_nitro()
-                if success:
-                    return {
-                        "success": True,
-                        "message": "Successfully forced Nitro model into driver"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": "Failed to force Nitro model into driver"
-                    }
-                
-            elif command == "force_predator_model":
-                # Force Predator model into driver
-                success = self.manager._force_model_predator()
-                if success:
-                    return {
-                        "success": True,
-                        "message": "Successfully forced Predator model into driver"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": "Failed to force Predator model into driver (Model may not support it)"
-                    }
+    def _h_get_version(self, params: Dict) -> PreEncodedJSON:
+        return self._version_response
 
-            elif command == "force_enable_all":
-                # Force Enable All Features into driver
-                success = self.manager._force_enable_all()
-                if success:
-                    return {
-                        "success": True,
-                        "message": "Successfully forced all features into driver"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": "Failed to force all features into driver (Model may not support it)"
-                    }
-                
-            elif command == "get_modprobe_parameter":
-                print (self.manager.get_modprobe_parameter())
-                return {
-                    "success": True,
-                    "data": {
-                        "parameter": self.manager.get_modprobe_parameter()
-                    }
-                }
+    def _h_force_nitro_model(self, params: Dict) -> Dict:
+        # Force Nitro model into driver
+        success = self.manager._force_model_nitro()
+        if success:
+            return {
+                "success": True,
+                "message": "Successfully forced Nitro model into driver"
+            }
+        else:
+            return {
+                "success": False,
+                "error": "Failed to force Nitro model into driver"
+            }
 
-            # Force Model and Parameters Permanantly
-            elif command == "set_modprobe_parameter_nitro":
-                success = self.manager.set_modprobe_parameter("nitro_v4")
-                return {
-                    "success": success,
-                    "data": {"parameter": param} if success else None,
-                    "error": "Failed to set modprobe parameter" if not success else None
-                }
-            
-            elif command == "set_modprobe_parameter_predator":
-                param = params.get("parameter", "")
-                success = self.manager.set_modprobe_parameter("predator_v4")
-                return {
-                    "success": success,
-                    "data": {"parameter": param} if success else None,
-                    "error": "Failed to set modprobe parameter" if not success else None
-                }
-            
-            elif command == "set_modprobe_parameter_enable_all":
-                param = params.get("parameter", "")
-                success = self.manager.set_modprobe_parameter("enable_all")
-                return {
-                    "success": success,
-                    "data": {"parameter": param} if success else None,
-                    "error": "Failed to set modprobe parameter" if not success else None
-                }
+    def _h_force_predator_model(self, params: Dict) -> Dict:
+        # Force Predator model into driver
+        success = self.manager._force_model_predator()
+        if success:
+            return {
+                "success": True,
+                "message": "Successfully forced Predator model into driver"
+            }
+        else:
+            return {
+                "success": False,
+                "error": "Failed to force Predator model into driver (Model may not support it)"
+            }
 
-            elif command == "remove_modprobe_parameter":
-                success = self.manager._remove_modprobe_parameter()
-                return {
-                    "success": success,
-                    "message": "Successfully removed modprobe parameter" if success else None,
-                    "error": "Failed to remove modprobe parameter" if not success else None
-                }
-            
-            elif command == "restart_daemon":
-                # Force Nitro model into driver
-                success = self.manager._restart_daemon()
-                if success:
-                    return {
-                        "success": True,
-                        "message": "Successfully restarted DAMX daemon"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": "Failed to Restart DAMX daemon (Check logs for details)"
-                    }           
+    def _h_force_enable_all(self, params: Dict) -> Dict:
+        # Force Enable All Features into driver
+        success = self.manager._force_enable_all()
+        if success:
+            return {
+                "success": True,
+                "message": "Successfully forced all features into driver"
+            }
+        else:
+            return {
+                "success": False,
+                "error": "Failed to force all features into driver (Model may not support it)"
+            }
 
-            elif command == "restart_drivers_and_daemon":
-                # Restart acer-sense driver and DAMX daemon service
-                success = self.manager._restart_drivers_and_daemon()
-                if success:
-                    return {
-                        "success": True,
-                        "message": "Successfully restarted drivers and daemon"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": "Failed to restart drivers and daemon"
-                    }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Unknown command: {command}"
-                }
+    def _h_get_modprobe_parameter(self, params: Dict) -> Dict:
+        parameter = self.manager.get_modprobe_parameter()
+        log.debug("Current modprobe parameter: %s", parameter)
+        return {
+            "success": True,
+            "data": {
+                "parameter": parameter
+            }
+        }
 
-        except Exception as e:
-            log.error(f"Error processing command {command}: {e}")
-            log.error(traceback.format_exc())
+    def _h_set_modprobe_parameter_nitro(self, params: Dict) -> Dict:
+        param = params.get("parameter", "")
+        success = self.manager.set_modprobe_parameter("nitro_v4")
+        return {
+            "success": success,
+            "data": {"parameter": param} if success else None,
+            "error": "Failed to set modprobe parameter" if not success else None
+        }
+
+    def _h_set_modprobe_parameter_predator(self, params: Dict) -> Dict:
+        param = params.get("parameter", "")
+        success = self.manager.set_modprobe_parameter("predator_v4")
+        return {
+            "success": success,
+            "data": {"parameter": param} if success else None,
+            "error": "Failed to set modprobe parameter" if not success else None
+        }
+
+    def _h_set_modprobe_parameter_enable_all(self, params: Dict) -> Dict:
+        param = params.get("parameter", "")
+        success = self.manager.set_modprobe_parameter("enable_all")
+        return {
+            "success": success,
+            "data": {"parameter": param} if success else None,
+            "error": "Failed to set modprobe parameter" if not success else None
+        }
+
+    def _h_remove_modprobe_parameter(self, params: Dict) -> Dict:
+        success = self.manager._remove_modprobe_parameter()
+        return {
+            "success": success,
+            "message": "Successfully removed modprobe parameter" if success else None,
+            "error": "Failed to remove modprobe parameter" if not success else None
+        }
+
+    def _h_restart_daemon(self, params: Dict) -> Dict:
+        success = self.manager._restart_daemon()
+        if success:
+            return {
+                "success": True,
+                "message": "Successfully restarted DAMX daemon"
+            }
+        else:
             return {
                 "success": False,
-                "error": str(e)
+                "error": "Failed to Restart DAMX daemon (Check logs for details)"
+            }
+
+    def _h_restart_drivers_and_daemon(self, params: Dict) -> Dict:
+        # Restart acer-sense driver and DAMX daemon service
+        success = self.manager._restart_drivers_and_daemon()
+        if success:
+            return {
+                "success": True,
+                "message": "Successfully restarted drivers and daemon"
+            }
+        else:
+            return {
+                "success": False,
+                "error": "Failed to restart drivers and daemon"
             }
 
 
@@ -1257,14 +2035,16 @@ class DAMXDaemon:
 
     def load_config(self):
         """Load configuration from file"""
-        config = configparser.ConfigParser()
+        import configparser  # Only needed once at startup
 
         # Create default config if it doesn't exist
         if not os.path.exists(CONFIG_PATH):
-            log.info(f"Creating default config at {CONFIG_PATH}")
+            log.info("Creating default config at %s", CONFIG_PATH)
+            config = configparser.ConfigParser()
             config['General'] = {
                 'LogLevel': 'INFO',
-                'AutoDetectFeatures': 'True'
+                'AutoDetectFeatures': 'True',
+                'AsyncWrites': 'False'
             }
 
             # Create config directory if it doesn't exist
@@ -1275,6 +2055,7 @@ class DAMXDaemon:
                 config.write(f)
         else:
             # Load existing config
+            config = configparser.ConfigParser()
             config.read(CONFIG_PATH)
 
         self.config = config
@@ -1286,7 +2067,7 @@ class DAMXDaemon:
                 #log.setLevel(getattr(logging, log_level))
                 log.setLevel(logging.DEBUG)
                 
-                log.info(f"Log level set to {log_level}")
+                log.info("Log level set to %s", log_level)
 
         return config
 
@@ -1298,6 +2079,8 @@ class DAMXDaemon:
         try:
             # Initialize DAMXManager
             self.manager = DAMXManager()
+            if self.config.getboolean('General', 'AsyncWrites', fallback=False):
+                self.manager.enable_async_writes()
 
             # Initialize keyboard monitor early
             # self.keyboard_monitor = KeyboardMonitor(
@@ -1311,18 +2094,16 @@ class DAMXDaemon:
             #     log.error("Failed to start keyboard monitoring")
             #     # Don't return False here - continue with reduced functionality
 
-            # Initialize power monitor
+            # Initialize power monitor, it is attached to the server's event loop in run()
             self.power_monitor = PowerSourceDetector(self.manager)
-            self.power_monitor.start_monitoring()
 
             # Log detected features
             features_str = ", ".join(sorted(self.manager.available_features))
-            log.info(f"Detected features: {features_str}")
+            log.info("Detected features: %s", features_str)
 
             return True
         except Exception as e:
-            log.error(f"Failed to set up daemon: {e}")
-            log.error(traceback.format_exc())
+            log.error("Failed to set up daemon: %s", e, exc_info=True)
             return False
     
 
@@ -1330,8 +2111,11 @@ class DAMXDaemon:
     def run(self):
         """Run the daemon"""
         # Write PID file
-        with open(PID_FILE, 'w') as f:
-            f.write(str(os.getpid()))
+        fd = os.open(PID_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+        try:
+            os.write(fd, b"%d" % os.getpid())
+        finally:
+            os.close(fd)
 
         # Set up signal handlers
         signal.signal(signal.SIGTERM, self.signal_handler)
@@ -1348,13 +2132,13 @@ class DAMXDaemon:
         try:
             self.running = True
             self.server = DaemonServer(self.manager)
-            self.power_monitor.start_monitoring()
+            # Power source uevents are served by the same loop as the clients
+            self.power_monitor.attach(self.server)
             self.server.start()
             # Start keyboard monitoring
             
         except Exception as e:
-            log.error(f"Error running daemon: {e}")
-            log.error(traceback.format_exc())
+            log.error("Error running daemon: %s", e, exc_info=True)
         finally:
             self.cleanup()
 
@@ -1385,13 +2169,16 @@ class DAMXDaemon:
 
     def signal_handler(self, sig, frame):
         """Handle termination signals"""
-        log.info(f"Received signal {sig}, shutting down...")
+        log.info("Received signal %s, shutting down...", sig)
         self.running = False
         if self.server:
             self.server.running = False
+            self.server.wakeup()
 
 def parse_args():
     """Parse command line arguments"""
+    import argparse  # Only needed once at startup
+
     parser = argparse.ArgumentParser(description="DAMX-Daemon")
     parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose logging")
     parser.add_argument('--version', action='version', version=f"DAMX-Daemon v{VERSION}")
@@ -1399,21 +2186,9 @@ def parse_args():
     parser.add_argument('--config', type=str, help=f"Path to config file (default: {CONFIG_PATH})")
     return parser.parse_args()
 
-def signal_handler(self, sig, frame):
-    """Handle termination signals"""
-    log.info(f"Received signal {sig}, shutting down...")
-    self.running = False
-    if self.server:
-        self.server.running = False
-    # Ensure socket is cleaned up
-    if hasattr(self, 'server') and self.server:
-        self.server.cleanup_socket()
-
 def main():
     """Main function"""
     args = parse_args()
-    
-    log.info(f"Driver Version: {DAMXManager().get_driver_version()}")
 
     # Set log level based on verbosity
     if args.verbose:
@@ -1427,6 +2202,7 @@ def main():
 
     daemon = DAMXDaemon()
     if daemon.setup():
+        log.info("Driver Version: %s", daemon.manager.get_driver_version())
         daemon.run()
     else:
         log.error("Failed to set up daemon, exiting...")
@@ -3,9 +3,14 @@
 KeyboardMonitor - Simple keyboard monitor that launches GUI as regular user
 """
 
+import ctypes
+import errno
+import fcntl
+import itertools
 import os
 import struct
 import select
+import shlex
 import subprocess
 import threading
 import logging
@@ -16,57 +21,154 @@ from pathlib import Path
 import platform
 IS_64BIT = platform.machine().endswith('64')
 EVENT_SIZE = 24 if IS_64BIT else 16
+# struct input_event: timeval, then u16 type, u16 code, s32 value
+_TYPE_OFFSET = EVENT_SIZE - 8
+_EVENT_TAIL = struct.Struct('HHi')
+# Events read per syscall
+EVENT_BATCH = 64
 
 # Event types and codes
 EV_KEY = 1
-KEY_PRESS = 1
+KEY_PRESS = 1  # 0 is release, 2 is auto-repeat
 TARGET_KEYCODE = 425
+KEY_MAX = 0x2ff
+
+# EVIOCGBIT(EV_KEY, len): _IOC(_IOC_READ, 'E', 0x20 + EV_KEY, len), fills the device's key bitmap
+_KEY_BITS_SIZE = (KEY_MAX + 7) // 8
+EVIOCGBIT_KEY = (2 << 30) | (_KEY_BITS_SIZE << 16) | (ord('E') << 8) | (0x20 + EV_KEY)
+
+# Event nodes appear and disappear here as input devices are plugged in and out
+INPUT_DIR = "/dev/input"
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+
+# Presses closer together than this launch the GUI only once
+DEBOUNCE_NS = 500_000_000
+
+# Login records read by `who`; the console user is re-resolved when this changes
+UTMP_PATH = "/var/run/utmp"
+
+# Added to the monitor thread's nice value so idle wakeups don't ramp the CPU
+MONITOR_NICENESS = 10
+
+def _watch_directory(path, mask):
+    """Non-blocking inotify fd watching path, or None where inotify is unavailable"""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
 
 class KeyboardMonitor:
     def __init__(self, target_keycode=TARGET_KEYCODE, command_to_run="/opt/damx/gui/DivAcerManagerMax", logger=None):
         self.target_keycode = target_keycode
+        # Where the target key sits in an EVIOCGBIT key bitmap
+        byte, bit = divmod(target_keycode, 8)
+        self._key_byte, self._key_mask = byte, 1 << bit
+        self._key_bits = bytearray(_KEY_BITS_SIZE)
+        # type, code and value of a target key press exactly as the kernel writes them
+        self._press_pattern = _EVENT_TAIL.pack(EV_KEY, target_keycode, KEY_PRESS)
         self.command_to_run = command_to_run
+        # Split once; the command runs without a shell
+        self._argv = shlex.split(command_to_run)
         self.running = False
         self.device_path = None
         self.monitor_thread = None
+        self._last_fire_ns = 0
+        # Matching device, kept until an input device is added or removed
+        self._device_cache = None
+        # Console user and the utmp mtime it was resolved at
+        self._cached_user = None
+        self._cached_user_mtime = None
+        # GUI launch command and the user it was built for
+        self._launch_user = None
+        self._launch_cmd = None
+        # Room for a burst of events, drained with one read per wakeup
+        self._buf = bytearray(EVENT_SIZE * EVENT_BATCH)
+        self._view = memoryview(self._buf)
+        # Bytes of an incomplete event left at the start of the buffer by a short read
+        self._partial = 0
         self.log = logger or logging.getLogger("KeyboardMonitor")
+        # Written by stop_monitoring so the monitor thread can block without a timeout,
+        # open only while monitoring
+        self._stop_r = self._stop_w = None
         
     def find_keyboard_device(self):
-        """Find the keyboard input device"""
+        """Find the input device that can send the target keycode"""
+        if self._device_cache is None:
+            device_path = self._find_device_by_keybits()
+            if device_path:
+                self.log.info(f"Found keyboard device: {device_path}")
+            else:
+                # Event nodes could not be queried, go by the device names instead
+                device_path = self._find_device_from_proc()
+            self._device_cache = device_path
+        return self._device_cache
+
+    def _find_device_by_keybits(self):
+        """Ask each /dev/input/event* node whether it advertises the target keycode"""
+        try:
+            names = [name for name in os.listdir(INPUT_DIR) if name.startswith("event")]
+        except OSError:
+            return None
+
+        bits = self._key_bits
+        for name in sorted(names, key=lambda n: int(n[5:]) if n[5:].isdigit() else -1):
+            path = os.path.join(INPUT_DIR, name)
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+            except OSError:
+                continue
+            try:
+                fcntl.ioctl(fd, EVIOCGBIT_KEY, bits)
+            except OSError:
+                continue
+            finally:
+                os.close(fd)
+            if bits[self._key_byte] & self._key_mask:
+                return path
+        return None
+
+    def _find_device_from_proc(self):
+        """Find a keyboard by name in /proc/bus/input/devices"""
         try:
             devices_path = Path("/proc/bus/input/devices")
             if not devices_path.exists():
                 self.log.error("Cannot access /proc/bus/input/devices")
                 return None
                 
+            is_keyboard = False
+            event_num = None
+
             with open(devices_path, 'r') as f:
-                content = f.read()
-                
-            devices = content.split('\n\n')
-            
-            for device in devices:
-                lines = device.strip().split('\n')
-                if not lines:
-                    continue
-                    
-                is_keyboard = False
-                event_num = None
-                
-                for line in lines:
+                # A trailing blank line closes the last stanza like the others
+                for line in itertools.chain(f, ('',)):
                     line = line.strip()
-                    if 'keyboard' in line.lower():
-                        is_keyboard = True
-                    elif line.startswith('H:') and 'event' in line:
-                        import re
-                        match = re.search(r'event(\d+)', line)
-                        if match:
-                            event_num = match.group(1)
-                
-                if is_keyboard and event_num:
-                    device_path = f"/dev/input/event{event_num}"
-                    if os.path.exists(device_path):
-                        self.log.info(f"Found keyboard device: {device_path}")
-                        return device_path
+                    if line:
+                        if 'keyboard' in line.lower():
+                            is_keyboard = True
+                        elif line.startswith('H:') and 'event' in line:
+                            # e.g. "H: Handlers=sysrq kbd leds event3"
+                            for handler in line.split():
+                                if handler.startswith('event') and handler[5:].isdigit():
+                                    event_num = handler[5:]
+                        continue
+
+                    # Blank line: end of one device's stanza
+                    if is_keyboard and event_num:
+                        device_path = f"/dev/input/event{event_num}"
+                        if os.path.exists(device_path):
+                            self.log.info(f"Found keyboard device: {device_path}")
+                            return device_path
+                    is_keyboard = False
+                    event_num = None
                         
         except Exception as e:
             self.log.error(f"Error finding keyboard device: {e}")
@@ -77,32 +179,17 @@ class KeyboardMonitor:
         """Execute the GUI command using systemd-run for proper user context"""
         try:
             # Get the current desktop user (most reliable method)
-            user = os.environ.get('SUDO_USER') or self.get_console_user()
+            user = os.environ.get('SUDO_USER') or self._cached_console_user()
             if not user:
                 self.log.error("Could not determine user to run command")
                 return False
 
-            # Get the user's environment
-            env = os.environ.copy()
-            
-            # Add essential environment variables
-            env.update({
-                'DISPLAY': ':0',
-                'XAUTHORITY': f'/home/{user}/.Xauthority',
-                'DBUS_SESSION_BUS_ADDRESS': f'unix:path=/run/user/{os.getuid()}/bus'
-            })
-
-            # Try running as the user with proper environment
-            cmd = [
-                'sudo', '-u', user,
-                'env',
-                f'DISPLAY={env["DISPLAY"]}',
-                f'XAUTHORITY={env["XAUTHORITY"]}',
-                f'DBUS_SESSION_BUS_ADDRESS={env["DBUS_SESSION_BUS_ADDRESS"]}',
-                self.command_to_run
-            ]
-            
-            subprocess.Popen(cmd, 
+            # Only rebuilt when the desktop user changes
+            if user != self._launch_user:
+                self._launch_cmd = self._build_launch_cmd(user)
+                self._launch_user = user
+
+            subprocess.Popen(self._launch_cmd, 
                             stdout=subprocess.DEVNULL, 
                             stderr=subprocess.DEVNULL,
                             start_new_session=True)
@@ -113,6 +200,30 @@ class KeyboardMonitor:
             self.log.error(f"Failed to execute command: {e}")
             return False
     
+    def _build_launch_cmd(self, user):
+        """Command line running the GUI as user with its display and session bus"""
+        # Try running as the user with proper environment
+        return [
+            'sudo', '-u', user,
+            'env',
+            'DISPLAY=:0',
+            f'XAUTHORITY=/home/{user}/.Xauthority',
+            f'DBUS_SESSION_BUS_ADDRESS=unix:path=/run/user/{os.getuid()}/bus',
+            *self._argv
+        ]
+
+    def _cached_console_user(self):
+        """Console user, only running `who` again after a login or logout"""
+        try:
+            mtime = os.stat(UTMP_PATH).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if self._cached_user is None or mtime is None or mtime != self._cached_user_mtime:
+            self._cached_user = self.get_console_user()
+            self._cached_user_mtime = mtime
+        return self._cached_user
+
     def get_console_user(self):
         """Get the user currently logged into the console"""
         try:
@@ -130,43 +241,135 @@ class KeyboardMonitor:
             pass
         return None
     
+    def _open_device(self):
+        """Open the input device for non-blocking reads"""
+        self._partial = 0
+        return self._open_device_at(self.device_path)
+
+    @staticmethod
+    def _open_device_at(path):
+        """Open an input device node as a raw fd for non-blocking reads"""
+        # Not inherited by the GUI process launched on a key press
+        return os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+
+    def read_events(self, device):
+        """Handle every event the device fd has queued, launching the GUI on the target key"""
+        # Read until the device is empty; an edge-triggered wakeup will not repeat
+        while True:
+            try:
+                n = os.readv(device, (self._view[self._partial:],))
+            except InterruptedError:
+                continue
+            except BlockingIOError:
+                return
+            if not n:
+                return
+
+            # evdev hands out whole events, but keep any tail for the next read
+            n += self._partial
+            whole = n - n % EVENT_SIZE
+            buf = self._buf
+
+            # Let bytearray.find scan for the target press instead of decoding
+            # every record; a hit only counts where a record's type field starts
+            offset = buf.find(self._press_pattern, _TYPE_OFFSET, whole)
+            while offset >= 0:
+                if (offset - _TYPE_OFFSET) % EVENT_SIZE == 0:
+                    now = time.monotonic_ns()
+                    if now - self._last_fire_ns >= DEBOUNCE_NS:
+                        self._last_fire_ns = now
+                        self.log.info(f"Target keycode {self.target_keycode} pressed!")
+                        self.execute_command()
+                offset = buf.find(self._press_pattern, offset + 1, whole)
+
+            self._partial = n - whole
+            if self._partial:
+                buf[:self._partial] = buf[whole:n]
+
     def monitor_events(self):
         """Monitor keyboard events"""
         if not self.device_path:
             self.log.error("No device path set")
             return
+
+        # Linux applies nice per thread, so this only demotes the monitor
+        try:
+            os.nice(MONITOR_NICENESS)
+        except OSError:
+            pass
             
+        device = None
+        hotplug_fd = _watch_directory(INPUT_DIR, IN_CREATE | IN_DELETE)
         try:
-            with open(self.device_path, 'rb') as device:
+            with select.epoll() as poller:
+                poller.register(self._stop_r, select.EPOLLIN)
+                if hotplug_fd is not None:
+                    poller.register(hotplug_fd, select.EPOLLIN)
+                device = self._open_device()
+                # Edge-triggered since read_events drains the device
+                poller.register(device, select.EPOLLIN | select.EPOLLET)
                 self.log.info(f"Monitoring {self.device_path} for keycode {self.target_keycode}")
                 
                 while self.running:
-                    ready, _, _ = select.select([device], [], [], 1.0)
-                    
-                    if not ready:
-                        continue
-                        
-                    data = device.read(EVENT_SIZE)
-                    if len(data) != EVENT_SIZE:
-                        continue
-                    
-                    if IS_64BIT:
-                        _, _, event_type, code, value = struct.unpack('QQHHi', data)
-                    else:
-                        _, _, event_type, code, value = struct.unpack('IIHHi', data)
-                    
-                    if (event_type == EV_KEY and 
-                        code == self.target_keycode and 
-                        value == KEY_PRESS):
-                        
-                        self.log.info(f"Target keycode {self.target_keycode} pressed!")
-                        self.execute_command()
+                    for fd, _ in poller.poll():
+                        if fd == self._stop_r:
+                            self._drain_fd(self._stop_r)
+                        elif fd == hotplug_fd:
+                            self._drain_fd(hotplug_fd)
+                            # Rescan on the next lookup; reconnect if our device is gone
+                            self._device_cache = None
+                            if device is None:
+                                device = self._reopen_device(poller, device)
+                        elif device is not None:
+                            try:
+                                self.read_events(device)
+                            except OSError as e:
+                                if e.errno != errno.ENODEV or hotplug_fd is None:
+                                    raise
+                                self.log.info(f"{self.device_path} was removed, waiting for a keyboard")
+                                self._device_cache = None
+                                device = self._reopen_device(poller, device)
                         
         except PermissionError:
             self.log.error(f"Permission denied accessing {self.device_path}. Run as root.")
         except Exception as e:
             self.log.error(f"Error monitoring events: {e}")
-    
+        finally:
+            if device is not None:
+                os.close(device)
+            if hotplug_fd is not None:
+                os.close(hotplug_fd)
+
+    def _reopen_device(self, poller, device):
+        """Swap the monitored device for the one that matches now, None if there is none"""
+        if device is not None:
+            poller.unregister(device)
+            os.close(device)
+
+        device_path = self.find_keyboard_device()
+        if not device_path:
+            return None
+        try:
+            device = self._open_device_at(device_path)
+        except OSError as e:
+            self.log.error(f"Error opening {device_path}: {e}")
+            return None
+
+        self.device_path = device_path
+        self._partial = 0
+        poller.register(device, select.EPOLLIN | select.EPOLLET)
+        self.log.info(f"Monitoring {self.device_path} for keycode {self.target_keycode}")
+        return device
+
+    @staticmethod
+    def _drain_fd(fd):
+        """Discard everything readable on a non-blocking fd"""
+        try:
+            while os.read(fd, 4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
     def start_monitoring(self):
         """Start monitoring"""
         if self.running:
@@ -177,6 +380,7 @@ class KeyboardMonitor:
             return False
             
         self.running = True
+        self._stop_r, self._stop_w = os.pipe2(os.O_CLOEXEC | os.O_NONBLOCK)
         self.monitor_thread = threading.Thread(target=self.monitor_events, daemon=True)
         self.monitor_thread.start()
         
@@ -186,8 +390,21 @@ class KeyboardMonitor:
     def stop_monitoring(self):
         """Stop monitoring"""
         self.running = False
+        if self._stop_w is None:
+            return
+        try:
+            os.write(self._stop_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2.0)
+            if self.monitor_thread.is_alive():
+                # Still polling the pipe, leave it open rather than risk a reused fd
+                return
+
+        os.close(self._stop_r)
+        os.close(self._stop_w)
+        self._stop_r = self._stop_w = None
 
 
 if __name__ == "__main__":
@@ -2,13 +2,37 @@
 # DAMX Power Source Detection - Monitors power source and adjusts thermal profiles accordingly
 
 import os
+import errno
+import functools
 import logging
-import subprocess
-from threading import Timer
+import select
+import socket
+from threading import Thread
 
 # Get logger from main daemon
 log = logging.getLogger("DAMXDaemon")
 
+# Kernel uevent broadcast, see netlink(7)
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+UEVENT_BUFFER_SIZE = 8192
+POWER_SUPPLY_UEVENT = b"\0SUBSYSTEM=power_supply\0"
+
+POWER_SUPPLY_DIR = "/sys/class/power_supply"
+
+# First byte of the "online" attribute while on AC power
+AC_ONLINE = b"1"
+
+# Added to the watcher threads' nice value; they only sleep and read sysfs
+MONITOR_NICENESS = 10
+
+def _lower_thread_priority():
+    """Renice the calling thread (Linux applies nice per thread)"""
+    try:
+        os.nice(MONITOR_NICENESS)
+    except OSError:
+        pass
+
 class PowerSourceDetector:
     """Detects power source and manages automatic mode switching"""
 
@@ -16,7 +40,18 @@ class PowerSourceDetector:
         self.manager = manager
         self.current_source = None
         self.check_interval = 5  # seconds
-        self.timer = None
+        # With uevents, still re-check this often in case one is missed
+        self.uevent_fallback_interval = 60  # seconds
+        self.poll_thread = None
+        self.uevent_thread = None
+        # Event loop and uevent socket when attached to the daemon's loop
+        self._loop = None
+        self._uevent_sock = None
+        # Open "online" attribute of the AC adapter once it has been found, and its reader
+        self._ac_fd = None
+        self._read_ac = None
+        # Written by stop_monitoring to wake the uevent or polling thread
+        self._stop_r, self._stop_w = os.pipe2(os.O_CLOEXEC | os.O_NONBLOCK)
         
         log.info("PowerSourceDetector initialized")
         
@@ -28,17 +63,134 @@ class PowerSourceDetector:
         ]
 
     def start_monitoring(self):
-        """Start periodic power source checking"""
-        self.check_power_source()
-        log.info("Monitoring power source started")
+        """Start watching the power source, event driven where the kernel allows"""
+        uevent_sock = self._open_uevent_socket()
+        if uevent_sock is None:
+            self.check_power_source()
+            log.info("Monitoring power source started")
+            return
+
+        self._update_power_source()
+        self.uevent_thread = Thread(target=self._watch_uevents, args=(uevent_sock,),
+                                    name="DAMX-power-uevents", daemon=True)
+        self.uevent_thread.start()
+        log.info("Monitoring power source started (kernel uevents)")
+
+    def attach(self, loop):
+        """Watch the power source from an existing event loop instead of our own threads
+
+        loop provides add_reader(fileobj, callback), remove_reader(fileobj) and
+        call_every(interval, callback), see DaemonServer.
+        """
+        self._loop = loop
+        uevent_sock = self._open_uevent_socket()
+        if uevent_sock is None:
+            # Poll from the loop too, the manager must only be used from its thread
+            self._update_power_source()
+            loop.call_every(self.check_interval, self._on_poll_interval)
+            log.info("Monitoring power source started")
+            return
+
+        self._update_power_source()
+        self._uevent_sock = uevent_sock
+        loop.add_reader(uevent_sock, self._on_uevent)
+        loop.call_every(self.uevent_fallback_interval, self._on_fallback_interval)
+        log.info("Monitoring power source started (kernel uevents)")
 
     def stop_monitoring(self):
         """Stop periodic power source checking"""
-        if self.timer:
-            self.timer.cancel()
+        try:
+            os.write(self._stop_w, b"\0")
+        except OSError:
+            pass
+        self._detach()
 
-    def check_power_source(self):
-        """Check current power source and adjust settings if needed"""
+    def _detach(self):
+        """Remove the uevent socket from the event loop it was attached to"""
+        if self._uevent_sock is not None:
+            self._loop.remove_reader(self._uevent_sock)
+            self._uevent_sock.close()
+            self._uevent_sock = None
+        self._loop = None
+
+    def _on_uevent(self):
+        """Event loop callback for a readable uevent socket"""
+        try:
+            relevant = self._read_uevent(self._uevent_sock)
+        except OSError as e:
+            log.error(f"Error reading kernel uevents: {e}")
+            self._detach()
+            return
+        if relevant:
+            self._safe_update_power_source()
+
+    def _on_poll_interval(self):
+        """Event loop callback polling the power source when uevents are unavailable"""
+        if self._loop is not None:
+            self._safe_update_power_source()
+
+    def _on_fallback_interval(self):
+        """Event loop callback re-checking the power source in case a uevent was missed"""
+        if self._uevent_sock is not None:
+            self._safe_update_power_source()
+
+    def _open_uevent_socket(self):
+        """Subscribe to kernel uevents, or return None if that is not possible"""
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC,
+                                 NETLINK_KOBJECT_UEVENT)
+        except (OSError, AttributeError) as e:
+            log.warning(f"Kernel uevents unavailable, polling power source instead: {e}")
+            return None
+        try:
+            # Port id 0 lets the kernel pick a unique one
+            sock.bind((0, UEVENT_KERNEL_GROUP))
+        except OSError as e:
+            sock.close()
+            log.warning(f"Kernel uevents unavailable, polling power source instead: {e}")
+            return None
+        return sock
+
+    def _watch_uevents(self, sock):
+        """Re-check the power source on power_supply uevents and every fallback interval"""
+        _lower_thread_priority()
+        with sock:
+            while True:
+                ready, _, _ = select.select([sock, self._stop_r], [], [], self.uevent_fallback_interval)
+                if self._stop_r in ready:
+                    return
+
+                if sock in ready:
+                    try:
+                        if not self._read_uevent(sock):
+                            continue
+                    except OSError as e:
+                        log.error(f"Error reading kernel uevents: {e}")
+                        return
+
+                self._safe_update_power_source()
+
+    @staticmethod
+    def _read_uevent(sock) -> bool:
+        """Read one uevent, returning whether it may concern a power supply"""
+        try:
+            message = sock.recv(UEVENT_BUFFER_SIZE)
+        except OSError as e:
+            if e.errno != errno.ENOBUFS:
+                raise
+            # Messages were dropped, one of them may have been ours
+            return True
+        return POWER_SUPPLY_UEVENT in message
+
+    def _safe_update_power_source(self):
+        """_update_power_source for callbacks that must not raise"""
+        try:
+            self._update_power_source()
+        except Exception as e:
+            log.error(f"Error handling power source change: {e}")
+
+    def _update_power_source(self):
+        """Act on the current power source if it differs from the last one seen"""
         is_plugged_in = self._is_ac_connected()
 
         # Only take action if power state changed
@@ -46,58 +198,103 @@ class PowerSourceDetector:
             self.current_source = is_plugged_in
             self._handle_power_change(is_plugged_in)
 
-        # Schedule next check
-        self.timer = Timer(self.check_interval, self.check_power_source)
-        self.timer.daemon = True
-        self.timer.start()
+    def check_power_source(self):
+        """Check current power source and adjust settings if needed, then keep polling
+
+        The polling thread is only for standalone use. Once attached to an event
+        loop the manager belongs to the loop's thread, which does the polling.
+        """
+        self._update_power_source()
+        if self._loop is not None:
+            return
+
+        # One long-lived thread instead of a new Timer thread per check
+        self.poll_thread = Thread(target=self._poll_power_source,
+                                  name="DAMX-power-poll", daemon=True)
+        self.poll_thread.start()
+
+    def _poll_power_source(self):
+        """Re-check the power source every check_interval until stopped"""
+        _lower_thread_priority()
+        while not select.select([self._stop_r], [], [], self.check_interval)[0]:
+            self._safe_update_power_source()
 
     def _is_ac_connected(self) -> bool:
         """Check if AC power is connected"""
         try:
+            if self._ac_fd is not None:
+                try:
+                    return self._read_ac()[:1] == AC_ONLINE
+                except OSError:
+                    # Adapter went away, look it up again
+                    try:
+                        os.close(self._ac_fd)
+                    except OSError:
+                        pass
+                    self._ac_fd = None
+
             # Try each possible path for power supply status
-            for path in self.possible_power_supply_paths:
-                if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        status = f.read().strip()
-                        return status == "1"
+            for path in self._ac_online_paths():
+                try:
+                    fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+                except FileNotFoundError:
+                    continue
+                try:
+                    self._read_ac = self._make_ac_reader(fd)
+                except OSError:
+                    os.close(fd)
+                    raise
+                self._ac_fd = fd
+                return self._read_ac()[:1] == AC_ONLINE
 
-            # If no power supply file is found, try command-line tools
-            return self._check_using_upower() or self._check_using_acpi()
+            # No AC adapter found, report battery as the failed tool checks did
+            return False
 
         except Exception as e:
             log.error(f"Error checking power status: {e}")
             return False
 
-    def _check_using_upower(self) -> bool:
-        """Check power status using upower"""
+    @staticmethod
+    def _make_ac_reader(fd: int):
+        """Return a callable reading the start of the attribute behind fd
+
+        sysfs regenerates the value on every read at offset 0, so a single pread
+        is enough; files without pread support get lseek + read instead.
+        """
         try:
-            result = subprocess.run(
-                ["upower", "-i", "/org/freedesktop/UPower/devices/line_power_AC"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return "online: yes" in result.stdout
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            log.error(f"upower check failed: {e}")
-            return False
+            os.pread(fd, 2, 0)
+            return functools.partial(os.pread, fd, 2, 0)
+        except OSError as e:
+            if e.errno != errno.ESPIPE:
+                raise
+
+        def read_from_start() -> bytes:
+            os.lseek(fd, 0, os.SEEK_SET)
+            return os.read(fd, 2)
+        return read_from_start
 
-    def _check_using_acpi(self) -> bool:
-        """Check power status using acpi"""
+    def _ac_online_paths(self):
+        """Candidate "online" attributes: the usual AC names, then any Mains supply"""
+        yield from self.possible_power_supply_paths
         try:
-            result = subprocess.run(
-                ["acpi", "-a"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return "on-line" in result.stdout
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            log.error(f"acpi check failed: {e}")
-            return False
+            with os.scandir(POWER_SUPPLY_DIR) as entries:
+                supplies = [entry.path for entry in entries]
+        except OSError:
+            return
+        for supply in supplies:
+            try:
+                with open(os.path.join(supply, "type"), "rb") as f:
+                    if f.read().strip() != b"Mains":
+                        continue
+            except OSError:
+                continue
+            yield os.path.join(supply, "online")
 
     def _handle_power_change(self, is_plugged_in: bool):
         """Handle power source changes"""
+        # Settings such as the battery state may have changed with the source
+        self.manager.invalidate_settings_cache()
+
         if not hasattr(self.manager, 'available_features') or "thermal_profile" not in self.manager.available_features:
             return
 
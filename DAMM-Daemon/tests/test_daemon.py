@@ -0,0 +1,200 @@
+"""Tests for DAMX-Daemon against a temporary fake sysfs tree
+
+Run from DAMM-Daemon with: python -m unittest discover tests
+The daemon module refuses to load unless run as root, so these tests are
+skipped otherwise.
+"""
+
+import importlib.util
+import logging
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+DAEMON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load_daemon():
+    """Import DAMX-Daemon.py (not a valid module name), or None if not allowed"""
+    sys.path.insert(0, DAEMON_DIR)
+    spec = importlib.util.spec_from_file_location("damx_daemon", os.path.join(DAEMON_DIR, "DAMX-Daemon.py"))
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except (SystemExit, OSError):
+        # Not root, or the log file cannot be opened
+        return None
+    module.log.setLevel(logging.CRITICAL)
+    return module
+
+
+damx = _load_daemon()
+
+
+@unittest.skipIf(damx is None, "DAMX-Daemon must be importable (run as root)")
+class DaemonTestCase(unittest.TestCase):
+    """Builds a DAMXManager for a Nitro laptop whose sense attributes live in a temp dir"""
+
+    ATTRIBUTES = {
+        "fan_speed": "10,20",
+        "battery_limiter": "0",
+        "usb_charging": "0",
+    }
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base_path = self._tmp.name
+        for name, value in self.ATTRIBUTES.items():
+            self.write_attribute(name, value)
+
+        for name, replacement in (
+            ("_detect_laptop_type", lambda manager: damx.LaptopType.NITRO),
+            ("_get_base_path", lambda manager: self.base_path),
+            ("_reset_restart_attempts", lambda manager: None),
+        ):
+            patcher = mock.patch.object(damx.DAMXManager, name, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.manager = damx.DAMXManager()
+        self.addCleanup(self._tmp.cleanup)
+        self.addCleanup(self.manager.close_fds)
+
+    def write_attribute(self, name, value):
+        with open(os.path.join(self.base_path, name), "w") as f:
+            f.write(value + "\n")
+
+
+class ReadCacheTest(DaemonTestCase):
+
+    def test_polling_faster_than_ttl_sees_changes(self):
+        ttl_ms = self.manager.READ_CACHE_TTL_OVERRIDES_MS["fan_speed"]
+        self.assertEqual(self.manager.get_all_settings()["fan_speed"], {"cpu": "10", "gpu": "20"})
+
+        self.write_attribute("fan_speed", "55,66")
+        # Worst case: the value was cached just before the change, plus the settings snapshot
+        deadline = time.monotonic() + (ttl_ms + self.manager.SETTINGS_CACHE_TTL_MS) / 1000 + 0.2
+        while True:
+            if self.manager.get_all_settings()["fan_speed"] == {"cpu": "55", "gpu": "66"}:
+                break
+            self.assertLess(time.monotonic(), deadline, "changed fan_speed never showed up")
+            time.sleep(ttl_ms / 5000)
+
+
+class FanCurveTest(DaemonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.server = damx.DaemonServer(self.manager)
+        self.set_fan_curve = self.server._handlers["set_fan_curve"]
+
+    def read_fan_speed(self):
+        with open(os.path.join(self.base_path, "fan_speed")) as f:
+            return f.read().strip()
+
+    def run_due_calls(self):
+        """Make every pending call_later due and run it"""
+        for entry in self.server._periodic:
+            entry[0] = 0
+        self.server._run_periodic()
+
+    def test_points_are_held_in_turn(self):
+        response = self.set_fan_curve({"points": [[30, 40], [50, 60], [70, 80]], "hold_ms": 500})
+        self.assertTrue(response["success"])
+        self.assertEqual(self.read_fan_speed(), "30,40")
+
+        self.run_due_calls()
+        self.assertEqual(self.read_fan_speed(), "50,60")
+        self.run_due_calls()
+        self.assertEqual(self.read_fan_speed(), "70,80")
+        self.assertEqual(self.server._periodic, [])
+
+    def test_set_fan_speed_cancels_curve(self):
+        self.set_fan_curve({"points": [[30, 40], [50, 60]]})
+        self.server._handlers["set_fan_speed"]({"cpu": 90, "gpu": 95})
+
+        self.run_due_calls()
+        self.assertEqual(self.read_fan_speed(), "90,95")
+
+    def test_malformed_points_are_rejected(self):
+        for points in (None, [], "30,40", [30, 40], [[30]], [[30, 40, 50]], [["30", 40]], [[True, 40]], [None]):
+            with self.subTest(points=points):
+                response = self.set_fan_curve({"points": points})
+                self.assertFalse(response["success"])
+                self.assertIn("[cpu, gpu] integer pairs", response["error"])
+        self.assertEqual(self.read_fan_speed(), "10,20")
+
+    def test_short_hold_is_rejected(self):
+        response = self.set_fan_curve({"points": [[30, 40], [50, 60]], "hold_ms": 1})
+        self.assertFalse(response["success"])
+        self.assertEqual(self.read_fan_speed(), "10,20")
+
+
+class HandleRequestTest(DaemonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.server = damx.DaemonServer(self.manager)
+
+    def test_valid_request(self):
+        response = self.server.handle_request(b'{"command": "get_version"}')
+        self.assertEqual(damx._decode(response)["data"]["version"], damx.VERSION)
+
+    def test_malformed_json_is_rejected(self):
+        for data in (b'{"command":', b"\xff\xfe{}", b'{"command": "\xe9"}'):
+            with self.subTest(data=data):
+                self.assertEqual(self.server.handle_request(data),
+                                 {"success": False, "error": "Invalid JSON format"})
+
+    def test_non_object_requests_are_rejected(self):
+        for data in (b"[]", b'"x"', b"1", b"null", b'{"command": 1}',
+                     b'{"command": ["get_version"]}', b'{"command": "get_version", "params": []}'):
+            with self.subTest(data=data):
+                self.assertEqual(self.server.handle_request(data),
+                                 {"success": False, "error": "Invalid request"})
+
+
+class ExtractRequestsTest(DaemonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.server = damx.DaemonServer(self.manager)
+
+    def extract(self, buffer):
+        return list(self.server._extract_requests(buffer))
+
+    def test_back_to_back_bare_json(self):
+        buffer = bytearray(b'{"command":"a"}{"command":"b"} {"command":"\xc3\xa9"}')
+        self.assertEqual(self.extract(buffer), [
+            ({"command": "a"}, b""),
+            ({"command": "b"}, b""),
+            ({"command": "\u00e9"}, b""),
+        ])
+        self.assertEqual(buffer, b"")
+
+    def test_partial_tail_waits_for_more(self):
+        buffer = bytearray(b'{"command":"a"}{"command":"b')
+        self.assertEqual(self.extract(buffer), [({"command": "a"}, b"")])
+        self.assertEqual(buffer, b'{"command":"b')
+
+        buffer += b'"}'
+        self.assertEqual(self.extract(buffer), [({"command": "b"}, b"")])
+        self.assertEqual(buffer, b"")
+
+    def test_split_utf8_character_waits_for_more(self):
+        buffer = bytearray(b'{"command":"\xc3')
+        self.assertEqual(self.extract(buffer), [])
+        buffer += b'\xa9"}'
+        self.assertEqual(self.extract(buffer), [({"command": "\u00e9"}, b"")])
+
+    def test_malformed_after_valid_request(self):
+        buffer = bytearray(b'{"command":"a"}{command}')
+        self.assertEqual(self.extract(buffer), [({"command": "a"}, b""), (b"{command}", b"")])
+        self.assertEqual(buffer, b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,15 +8,102 @@ used for internal local packaging
 
 import os
 import sys
+import argparse
+import asyncio
+import datetime
 import subprocess
 import shutil
+import string
 import glob
+import hashlib
+import mmap
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Version declarations in the GUI, daemon and driver sources
+_PROJECT_VER_RE = re.compile(r'private readonly string ProjectVersion\s*=\s*"([\d.]+)"')
+_DAEMON_VER_RE = re.compile(r'VERSION\s*=\s*"([\d.]+)"')
+_DRIVER_VER_RE = re.compile(rb'#define\s+DRIVER_VERSION\s+"([\d.]+)"')
+
+# Version assignments in setup.sh; any version already there is replaced, not appended to
+_SETUP_VERSION_RE = re.compile(r'\b(PROJECT|DAEMON|DRIVERS)_VERSION=[\d.]*')
+
+# Contents of the package's release.txt
+_RELEASE_TMPL = string.Template("""DAMX Release Information
+========================
+
+Project Version: $project
+Daemon Version: $daemon
+Drivers Version: $drivers
+
+Build Date: $build_date
+Built on: $built_on
+
+Components:
+- DAMX-Daemon: Python daemon compiled with PyInstaller
+- DAMX-GUI: .NET 9.0 GUI application (self-contained)
+- Linuwu-Sense: Hardware drivers
+- setup.sh: Installation script
+""")
+
+# Build outputs and environments inside the source trees, left out of the source hash
+_BUILD_OUTPUT_DIRS = frozenset({"bin", "obj", "dist", "build", "venv", ".venv", "__pycache__"})
+
+
+def _tree_hash(root, *extra):
+    """Fingerprint a source tree from its file paths, sizes and mtimes (no contents are read)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for item in extra:
+        digest.update(f"{item}\0".encode())
+    
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _BUILD_OUTPUT_DIRS:
+                    pending.append(entry.path)
+            else:
+                st = entry.stat(follow_symlinks=False)
+                digest.update(f"{os.path.relpath(entry.path, root)}\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+    return digest.hexdigest()
+
+
+def _sendfile_copy(src, dst):
+    """Copy src to dst in the kernel with sendfile, then copy its metadata like copy2"""
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        size = os.fstat(src_fd).st_size
+        # Read-ahead hint for the copy, and drop the source pages once it's done
+        os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if not sent:
+                    break
+                offset += sent
+        finally:
+            os.close(dst_fd)
+        os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(src_fd)
+    shutil.copystat(src, dst)
+
+
+def _link_or_copy(src, dst):
+    """Hard-link src to dst, copying instead when they're on different filesystems"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        _sendfile_copy(src, dst)
+
 
 class DAMXBuilder:
-    def __init__(self):
+    def __init__(self, clean_daemon=False, use_cache=True):
         # Use the directory where the script is located
         script_path = Path(__file__).parent.absolute()
         self.base_dir = script_path
@@ -24,7 +111,17 @@ class DAMXBuilder:
         self.gui_dir = self.base_dir / "Div-Acer-Manager-Max" / "DivAcerManagerMax"
         self.drivers_dir = self.base_dir / "Div-Linuwu-Sense"
         self.publish_dir = self.base_dir / "Publish"
+        self.gui_publish_dir = self.gui_dir / "bin" / "Release" / "net9.0" / "linux-x64" / "publish"
         self.setup_script = self.base_dir / "Setup.sh"
+        self.log_dir = self.publish_dir / "logs"
+        # Filled in by check_dependencies
+        self.versions = {}
+        # Reuse PyInstaller's analysis between runs unless asked for a clean build
+        self.clean_daemon = clean_daemon
+        # Skip unchanged daemon/GUI builds, see _is_up_to_date
+        self.use_cache = use_cache
+        self.pyinstaller_work_dir = self.base_dir / ".pyi_work"
+        self.pyinstaller_spec_dir = self.base_dir / ".pyi_spec"
         
         # Icon files to copy
         self.icon_files = [
@@ -43,38 +140,15 @@ class DAMXBuilder:
         print()
         
     def get_version_info(self):
-        """Automatically detect version information from source files"""
-        print("=== Detecting DAMX Versions ===")
-        
-        # Detect project version (GUI)
-        project_version = self._detect_project_version()
-        if not project_version:
-            print("Error: Could not detect project version!")
-            sys.exit(1)
-            
-        # Detect daemon version
-        daemon_version = self._detect_daemon_version()
-        if not daemon_version:
-            print("Error: Could not detect daemon version!")
-            sys.exit(1)
-            
-        # Detect drivers version
-        drivers_version = self._detect_drivers_version()
-        if not drivers_version:
-            print("Error: Could not detect drivers version!")
-            sys.exit(1)
-            
+        """Report the versions that check_dependencies read from the source files"""
+        print("=== DAMX Versions ===")
         print(f"Detected versions:")
-        print(f"  - Project: {project_version}")
-        print(f"  - Daemon: {daemon_version}")
-        print(f"  - Drivers: {drivers_version}")
+        print(f"  - Project: {self.versions['project']}")
+        print(f"  - Daemon: {self.versions['daemon']}")
+        print(f"  - Drivers: {self.versions['drivers']}")
         print()
             
-        return {
-            'project': project_version,
-            'daemon': daemon_version,
-            'drivers': drivers_version
-        }
+        return dict(self.versions)
     
     def _detect_project_version(self):
         """Detect project version from GUI source file"""
@@ -84,13 +158,13 @@ class DAMXBuilder:
             return None
             
         try:
+            # The declaration sits near the top, so stop reading at the first hit
             with open(version_file, 'r') as f:
-                content = f.read()
-                
-            # Match: private readonly string ProjectVersion = "0.8.8";
-            match = re.search(r'private readonly string ProjectVersion\s*=\s*"([\d.]+)"', content)
-            if match:
-                return match.group(1)
+                for line in f:
+                    # Match: private readonly string ProjectVersion = "0.8.8";
+                    match = _PROJECT_VER_RE.search(line)
+                    if match:
+                        return match.group(1)
                 
             print(f"Warning: Could not find ProjectVersion in {version_file}")
             return None
@@ -107,12 +181,11 @@ class DAMXBuilder:
             
         try:
             with open(version_file, 'r') as f:
-                content = f.read()
-                
-            # Match: VERSION = "0.4.2"
-            match = re.search(r'VERSION\s*=\s*"([\d.]+)"', content)
-            if match:
-                return match.group(1)
+                for line in f:
+                    # Match: VERSION = "0.4.2"
+                    match = _DAEMON_VER_RE.search(line)
+                    if match:
+                        return match.group(1)
                 
             print(f"Warning: Could not find VERSION in {version_file}")
             return None
@@ -128,13 +201,12 @@ class DAMXBuilder:
             return None
             
         try:
-            with open(version_file, 'r') as f:
-                content = f.read()
-                
-            # Match: #define DRIVER_VERSION "25.625"
-            match = re.search(r'#define\s+DRIVER_VERSION\s+"([\d.]+)"', content)
-            if match:
-                return match.group(1)
+            # The driver source is the large one: search the mapped page cache directly
+            with open(version_file, 'rb') as f, mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+                # Match: #define DRIVER_VERSION "25.625"
+                match = _DRIVER_VER_RE.search(mm)
+                if match:
+                    return match.group(1).decode()
                 
             print(f"Warning: Could not find DRIVER_VERSION in {version_file}")
             return None
@@ -159,6 +231,18 @@ class DAMXBuilder:
         for icon_file in self.icon_files:
             if not icon_file.exists():
                 missing.append(f"Icon file: {icon_file}")
+        
+        # Read the versions now too, so a bad version file fails before the builds
+        for key, detect, declaration in (
+            ('project', self._detect_project_version, "ProjectVersion"),
+            ('daemon', self._detect_daemon_version, "VERSION"),
+            ('drivers', self._detect_drivers_version, "DRIVER_VERSION"),
+        ):
+            version = detect()
+            if version:
+                self.versions[key] = version
+            else:
+                missing.append(f"{declaration} declaration ({key} version)")
             
         if missing:
             print("Error: Missing required files/directories:")
@@ -166,7 +250,7 @@ class DAMXBuilder:
                 print(f"  - {item}")
             sys.exit(1)
             
-        print("✓ All required directories and files found")
+        print("✓ All required directories, files and versions found")
     
     def find_venv_python(self):
         """Find Python executable in venv or use current environment"""
@@ -185,7 +269,44 @@ class DAMXBuilder:
         print("⚠ No venv found, using system Python")
         return sys.executable
     
-    def build_daemon(self):
+    async def _run_logged(self, cmd, cwd, name, env=None):
+        """Run a build command in cwd, streaming its output to logs/<name>.log"""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        log_file = self.log_dir / f"{name}.log"
+        
+        print(f"Running: {' '.join(cmd)} (log: {log_file})")
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, cwd=cwd, env=env,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        with open(log_file, 'wb') as log:
+            async for line in proc.stdout:
+                log.write(line)
+        
+        returncode = await proc.wait()
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, cmd)
+        return log_file
+    
+    async def _tool_output(self, *cmd):
+        """stdout of a quick toolchain query, "" if it can't be run"""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+        except OSError:
+            return ""
+        stdout, _ = await proc.communicate()
+        return stdout.decode(errors='replace').strip()
+    
+    def _is_up_to_date(self, hash_file, artifact, source_hash):
+        """Whether artifact was built from sources matching source_hash"""
+        if not self.use_cache:
+            return False
+        try:
+            return artifact.exists() and hash_file.read_text() == source_hash
+        except OSError:
+            return False
+    
+    async def build_daemon(self):
         """Build the Python daemon using PyInstaller"""
         print("\n=== Building Daemon ===")
         
@@ -195,32 +316,39 @@ class DAMXBuilder:
         
         python_exe = self.find_venv_python()
         
-        # Change to daemon directory
-        original_cwd = os.getcwd()
-        os.chdir(self.daemon_dir)
-        
         try:
             # Run PyInstaller
             cmd = [
                 "pyinstaller",
                 "--onefile",
-                "--clean",
+                "--workpath", str(self.pyinstaller_work_dir),
+                "--distpath", str(self.daemon_dir / "dist"),
+                "--specpath", str(self.pyinstaller_spec_dir),
                 "DAMX-Daemon.py"
             ]
+            if self.clean_daemon:
+                cmd.insert(2, "--clean")
+            
+            daemon_dist = self.daemon_dir / "dist"
+            hash_file = daemon_dist / "DAMX-Daemon.hash"
+            # Toolchain and bundled packages count as inputs too
+            source_hash = _tree_hash(self.daemon_dir, *cmd,
+                                     await self._tool_output("pyinstaller", "--version"),
+                                     await self._tool_output(python_exe, "-m", "pip", "freeze"))
+            if not self.clean_daemon and self._is_up_to_date(hash_file, daemon_dist / "DAMX-Daemon", source_hash):
+                print("✓ Daemon sources and toolchain unchanged; skipping build")
+                return
             
-            print(f"Running: {' '.join(cmd)}")
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+            await self._run_logged(cmd, self.daemon_dir, "daemon")
+            hash_file.write_text(source_hash)
             print("✓ Daemon built successfully")
             
         except subprocess.CalledProcessError as e:
             print(f"Error building daemon: {e}")
-            print(f"stdout: {e.stdout}")
-            print(f"stderr: {e.stderr}")
-            sys.exit(1)
-        finally:
-            os.chdir(original_cwd)
+            print(f"See {self.log_dir / 'daemon.log'} for the build output")
+            raise
     
-    def build_gui(self):
+    async def build_gui(self):
         """Build the .NET GUI application"""
         print("\n=== Building GUI ===")
         
@@ -231,10 +359,6 @@ class DAMXBuilder:
                 print(f"Error: No .csproj file found in {self.gui_dir}")
                 sys.exit(1)
         
-        # Change to GUI directory
-        original_cwd = os.getcwd()
-        os.chdir(self.gui_dir)
-        
         try:
             cmd = [
                 "dotnet", "publish",
@@ -244,20 +368,50 @@ class DAMXBuilder:
                 "--self-contained", "true",
                 "/p:PublishSingleFile=true",
                 "/p:IncludeNativeLibrariesForSelfExtract=true",
-                "/p:IncludeAllContentForSelfExtract=true"
+                "/p:IncludeAllContentForSelfExtract=true",
+                # Precompile to native code so the GUI starts without JITting everything
+                "/p:PublishReadyToRun=true",
+                "/p:PublishTrimmed=false",
+                "/p:DebugType=none",
+                "/p:DebugSymbols=false",
+                "/p:BuildInParallel=true",
+                f"/m:{os.cpu_count() or 1}",
+                "--nologo"
             ]
             
-            print(f"Running: {' '.join(cmd)}")
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+            # Skip the first-run experience and telemetry probe on fresh machines
+            env = dict(os.environ,
+                       DOTNET_CLI_TELEMETRY_OPTOUT="1",
+                       DOTNET_SKIP_FIRST_TIME_EXPERIENCE="1",
+                       DOTNET_NOLOGO="1")
+            
+            hash_file = self.gui_publish_dir / "gui.hash"
+            # NuGet versions are pinned in the .csproj, which is part of the tree
+            source_hash = _tree_hash(self.gui_dir, *cmd, await self._tool_output("dotnet", "--version"))
+            if self._is_up_to_date(hash_file, self.gui_publish_dir / "DivAcerManagerMax", source_hash):
+                print("✓ GUI sources and toolchain unchanged; skipping build")
+                return
+            
+            await self._run_logged(cmd, self.gui_dir, "gui", env=env)
+            hash_file.write_text(source_hash)
             print("✓ GUI built successfully")
             
         except subprocess.CalledProcessError as e:
             print(f"Error building GUI: {e}")
-            print(f"stdout: {e.stdout}")
-            print(f"stderr: {e.stderr}")
+            print(f"See {self.log_dir / 'gui.log'} for the build output")
+            raise
+    
+    async def build_components(self):
+        """Run the daemon and GUI builds side by side, exiting if either failed"""
+        # Let both finish rather than leaving one toolchain running unattended
+        results = await asyncio.gather(self.build_daemon(), self.build_gui(), return_exceptions=True)
+        # Failed builds were already reported with their log; anything else
+        # (e.g. a missing toolchain) goes to main() to be printed
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, subprocess.CalledProcessError):
+                raise result
+        if any(isinstance(result, Exception) for result in results):
             sys.exit(1)
-        finally:
-            os.chdir(original_cwd)
     
     def create_package_structure(self, version):
         """Create the package directory structure"""
@@ -293,35 +447,37 @@ class DAMXBuilder:
             print(f"Error: Daemon executable not found at {daemon_executable}")
             sys.exit(1)
         
-        shutil.copy2(daemon_executable, daemon_target / "DAMX-Daemon")
+        _sendfile_copy(daemon_executable, daemon_target / "DAMX-Daemon")
         print("✓ Daemon executable copied")
     
     def copy_gui_executable(self, gui_target):
         """Copy the built GUI executable and icons"""
         print("Copying GUI executable and icons...")
         
-        # Find the published GUI executable
-        gui_publish_dir = self.gui_dir / "bin" / "Release" / "net9.0" / "linux-x64" / "publish"
-        
-        if not gui_publish_dir.exists():
-            print(f"Error: GUI publish directory not found at {gui_publish_dir}")
+        if not self.gui_publish_dir.exists():
+            print(f"Error: GUI publish directory not found at {self.gui_publish_dir}")
             sys.exit(1)
         
-        # Find the main executable (should be the .csproj name without extension)
-        executables = [f for f in gui_publish_dir.iterdir() if f.is_file() and f.stat().st_mode & 0o111]
-        
-        if not executables:
-            print(f"Error: No executable found in {gui_publish_dir}")
+        # Find the main executable (should be the .csproj name without extension),
+        # else use the first executable found. One pass, stopping at the named one;
+        # is_file() comes from the dirent type, leaving one stat per file for the mode
+        gui_executable = None
+        with os.scandir(self.gui_publish_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.stat().st_mode & 0o111:
+                    continue
+                if "DivAcerManagerMax" in entry.name:
+                    gui_executable = entry
+                    break
+                if gui_executable is None:
+                    gui_executable = entry
+        
+        if gui_executable is None:
+            print(f"Error: No executable found in {self.gui_publish_dir}")
             sys.exit(1)
         
-        # Use the first executable found (or look for specific name)
-        gui_executable = executables[0]
-        for exe in executables:
-            if "DivAcerManagerMax" in exe.name:
-                gui_executable = exe
-                break
-        
-        shutil.copy2(gui_executable, gui_target / "DivAcerManagerMax")
+        # The self-contained GUI is tens of MB: keep it out of userspace buffers
+        _sendfile_copy(gui_executable, gui_target / "DivAcerManagerMax")
         print(f"✓ GUI executable copied: {gui_executable.name}")
         
         # Copy icon files
@@ -341,7 +497,8 @@ class DAMXBuilder:
             print(f"Error: Drivers directory not found at {self.drivers_dir}")
             sys.exit(1)
         
-        shutil.copytree(self.drivers_dir, drivers_target)
+        # Nothing edits the staged files, so they can share the sources' inodes
+        shutil.copytree(self.drivers_dir, drivers_target, copy_function=_link_or_copy)
         print("✓ Drivers copied and renamed to Linuwu-Sense")
     
     def update_setup_script(self, package_dir, versions):
@@ -349,21 +506,20 @@ class DAMXBuilder:
         print("Updating setup script...")
         
         setup_target = package_dir / "setup.sh"
-        shutil.copy2(self.setup_script, setup_target)
         
-        # Read the setup script content
-        with open(setup_target, 'r') as f:
-            content = f.read()
+        # Transform in memory: one read of the source, one write of the target
+        content = self.setup_script.read_text()
         
-        # Update version information (basic replacement)
-        # You may need to adjust these patterns based on your setup.sh structure
-        content = content.replace("PROJECT_VERSION=", f"PROJECT_VERSION={versions['project']}")
-        content = content.replace("DAEMON_VERSION=", f"DAEMON_VERSION={versions['daemon']}")
-        content = content.replace("DRIVERS_VERSION=", f"DRIVERS_VERSION={versions['drivers']}")
+        # Update version information in a single pass over the script
+        # You may need to adjust _SETUP_VERSION_RE based on your setup.sh structure
+        subs = {
+            'PROJECT': f"PROJECT_VERSION={versions['project']}",
+            'DAEMON': f"DAEMON_VERSION={versions['daemon']}",
+            'DRIVERS': f"DRIVERS_VERSION={versions['drivers']}",
+        }
+        content = _SETUP_VERSION_RE.sub(lambda m: subs[m.group(1)], content)
         
-        # Write the updated content
-        with open(setup_target, 'w') as f:
-            f.write(content)
+        setup_target.write_text(content)
         
         # Make setup script executable
         setup_target.chmod(0o755)
@@ -375,25 +531,11 @@ class DAMXBuilder:
         
         release_file = package_dir / "release.txt"
         
-        release_content = f"""DAMX Release Information
-========================
-
-Project Version: {versions['project']}
-Daemon Version: {versions['daemon']}
-Drivers Version: {versions['drivers']}
-
-Build Date: {subprocess.check_output(['date'], text=True).strip()}
-Built on: {subprocess.check_output(['uname', '-a'], text=True).strip()}
-
-Components:
-- DAMX-Daemon: Python daemon compiled with PyInstaller
-- DAMX-GUI: .NET 9.0 GUI application (self-contained)
-- Linuwu-Sense: Hardware drivers
-- setup.sh: Installation script
-"""
+        # Same text as `date` and `uname -a`, without forking either
+        build_date = datetime.datetime.now().astimezone().strftime('%a %b %d %H:%M:%S %Z %Y')
+        built_on = ' '.join(os.uname())
         
-        with open(release_file, 'w') as f:
-            f.write(release_content)
+        release_file.write_text(_RELEASE_TMPL.substitute(versions, build_date=build_date, built_on=built_on))
         
         print("✓ Release information created")
     
@@ -402,38 +544,47 @@ Components:
         print("DAMX Build and Package Script")
         print("=" * 50)
         
-        # Get version information
-        versions = self.get_version_info()
-        
-        # Check dependencies
+        # Check dependencies and version files before spending minutes on builds
         self.check_dependencies()
+        versions = self.get_version_info()
         
-        # Build components
-        self.build_daemon()
-        self.build_gui()
+        # Build components; PyInstaller and dotnet are independent, so run both at once
+        asyncio.run(self.build_components())
         
         # Create package structure
         package_dir, daemon_target, gui_target, drivers_target = self.create_package_structure(versions['project'])
         
-        # Copy all components
-        self.copy_daemon_executable(daemon_target)
-        self.copy_gui_executable(gui_target)
-        self.copy_drivers(drivers_target)
-        
-        # Update setup script and create release info
-        self.update_setup_script(package_dir, versions)
-        self.create_release_info(package_dir, versions)
+        # Copy all components, update setup script and create release info.
+        # Each stage writes its own destination, so run them side by side
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            stages = [
+                pool.submit(self.copy_daemon_executable, daemon_target),
+                pool.submit(self.copy_gui_executable, gui_target),
+                pool.submit(self.copy_drivers, drivers_target),
+                pool.submit(self.update_setup_script, package_dir, versions),
+                pool.submit(self.create_release_info, package_dir, versions),
+            ]
+            for stage in stages:
+                stage.result()
         
         print(f"\n🎉 Build and packaging completed successfully!")
         print(f"Package location: {package_dir}")
         print(f"Package contents:")
-        for item in package_dir.iterdir():
-            print(f"  - {item.name}")
+        with os.scandir(package_dir) as entries:
+            for entry in entries:
+                print(f"  - {entry.name}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Build and package the DAMX suite")
+    parser.add_argument("--clean-daemon", action="store_true",
+                        help="discard PyInstaller's cached analysis (use for release builds)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="rebuild the daemon and GUI even if their sources are unchanged")
+    args = parser.parse_args()
+    
     try:
-        builder = DAMXBuilder()
+        builder = DAMXBuilder(clean_daemon=args.clean_daemon, use_cache=not args.no_cache)
         builder.build_and_package()
     except KeyboardInterrupt:
         print("\n⚠ Build cancelled by user")